@@ -4,15 +4,23 @@ Warcraft III Campaign (.w3n) Translation Tool
 Supports Google Translate and LLM (OpenAI/OpenRouter)
 """
 
+import functools
+import hashlib
 import os
+import random
 import re
 import shutil
+import sqlite3
 import subprocess
 import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
-import configparser
+
+from config_manager import parse_ini
 
 try:
     from tqdm import tqdm
@@ -20,6 +28,12 @@ try:
 except ImportError:
     TQDM_AVAILABLE = False
 
+try:
+    import chardet
+    CHARDET_AVAILABLE = True
+except ImportError:
+    CHARDET_AVAILABLE = False
+
 # Import custom modules
 try:
     from llm_translator import LLMTranslator
@@ -27,6 +41,12 @@ try:
 except ImportError:
     LLM_AVAILABLE = False
 
+# In-process MPQ access; mpqcli.exe is used when StormLib isn't installed
+try:
+    from stormlib import StormLibArchive, STORMLIB_AVAILABLE
+except ImportError:
+    STORMLIB_AVAILABLE = False
+
 # Try to import free googletrans (no API key needed)
 try:
     from googletrans import Translator as FreeTranslator
@@ -54,6 +74,189 @@ LANGUAGE_CODES = {
     'japanese': 'ja'
 }
 
+# Maximum number of Google Translate requests kept in flight at once
+GOOGLE_CONCURRENCY = 8
+
+# Number of strings sent per LLM request
+LLM_BATCH_SIZE = 20
+
+# Number of LLM batch requests in flight at once (the OpenAI client is thread-safe)
+LLM_CONCURRENCY = 4
+
+# Number of strings sent per Google Translate request (Cloud API accepts up to 128)
+GOOGLE_BATCH_SIZE = 100
+
+# Number of map archives processed in parallel within a campaign
+MAP_WORKERS = min(4, os.cpu_count() or 1)
+
+# Number of mpqcli extractions allowed to run ahead of translation
+MPQCLI_WORKERS = min(4, os.cpu_count() or 1)
+
+# Maximum number of translations kept in the in-memory cache
+TRANSLATION_CACHE_SIZE = 50000
+
+# Seconds before a single Google Translate request is abandoned (and retried)
+GOOGLE_TIMEOUT = 10.0
+
+# On-disk translation cache shared by every campaign translated from this folder
+TRANSLATION_CACHE_DB = "translation_cache.sqlite"
+
+# Google Translate requests per second; the free endpoint bans clients that go much faster
+GOOGLE_RATE_LIMIT = 5.0
+
+# Seconds the request rate stays halved after Google answers with HTTP 429
+RATE_LIMIT_PENALTY_SECONDS = 60
+
+# Short strings are joined into one googletrans item with a marker the translator keeps
+PACK_TOKEN = '<<<|W3|>>>'
+PACK_SEPARATOR = f'\n{PACK_TOKEN}\n'
+PACK_MAX_CHARS = 4000
+PACK_MAX_ITEMS = 50
+
+# Warcraft III color codes: |cAARRGGBB opens a colored run, |r closes it
+COLOR_CODE_PATTERN = re.compile(r'\|c[0-9A-Fa-f]{8}|\|r')
+COLOR_WRAPPER_PATTERN = re.compile(r'^(\|c[0-9A-Fa-f]{8})(.*?)(\|r)?$', re.DOTALL)
+
+# Bodies with no word characters at all (numbers, punctuation, separators)
+NO_WORDS_PATTERN = re.compile(r'^[\s\d\W_]*$')
+
+# Formatting tokens that carry no text: color codes and |n line breaks
+FORMAT_CODE_PATTERN = re.compile(r'\|c[0-9A-Fa-f]{8}|\|[rRnN]')
+
+# Raw identifiers: TRIGSTR_ references and four-character object IDs with a digit (h001, A00B)
+RAW_ID_PATTERN = re.compile(r'^(?:TRIGSTR_\d+|(?=[A-Za-z0-9]*\d)[A-Za-z0-9]{4})$')
+
+# End of a .wts STRING body: the closing brace on its own line, indentation allowed
+WTS_BODY_END_PATTERN = re.compile(rb'\n\s*\}')
+
+# Source languages written in CJK scripts, and the characters of those scripts
+# (kana, CJK ideographs, hangul). A body without any of them is already translated.
+CJK_SOURCE_CODES = ('zh-cn', 'ja', 'ko')
+CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]')
+
+# Chunk size for streaming campaign backups (campaigns can be hundreds of MB)
+COPY_BUFFER_SIZE = 1 << 20
+
+# Asset references that must never be sent to a translator
+ASSET_EXTENSIONS = ('.mdx', '.mdl', '.blp', '.tga', '.wav', '.mp3')
+
+class RateLimiter:
+    """Thread-safe token bucket that halves its rate for a while after rate-limit errors."""
+
+    def __init__(self, rate: float, penalty_seconds: float = RATE_LIMIT_PENALTY_SECONDS):
+        self.max_rate = rate
+        self.rate = rate
+        self.penalty_seconds = penalty_seconds
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate < self.max_rate and now >= self._penalty_until:
+                    self.rate = self.max_rate
+                burst = max(1.0, self.rate)
+                self._tokens = min(burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self):
+        """Halve the request rate after the server reported too many requests."""
+        with self._lock:
+            self.rate = max(self.rate / 2, 0.25)
+            self._penalty_until = time.monotonic() + self.penalty_seconds
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a translation error is an HTTP 429 (Too Many Requests)."""
+    if getattr(error, 'code', None) == 429:
+        return True
+    if getattr(getattr(error, 'response', None), 'status_code', None) == 429:
+        return True
+    message = str(error)
+    return '429' in message or 'Too Many Requests' in message
+
+
+def _detect_encoding(data: bytes) -> str:
+    """Pick the text encoding of a whole file once: UTF-8 if it decodes cleanly, else chardet's guess."""
+    try:
+        data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if CHARDET_AVAILABLE:
+        guess = chardet.detect(data).get('encoding')
+        if guess:
+            return guess
+    return 'utf-8'
+
+
+def _copy_file(src: str, dst: str):
+    """Copy a file in COPY_BUFFER_SIZE chunks, keeping its timestamps and mode."""
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=COPY_BUFFER_SIZE)
+    shutil.copystat(src, dst)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> Dict[str, Dict[str, str]]:
+    """Load configuration from config.ini (parsed once, shared read-only by all translators)."""
+    return parse_ini(Path("config.ini"))
+
+
+def _is_translatable(text: str) -> bool:
+    """Check whether a string body contains natural language worth translating."""
+    stripped = FORMAT_CODE_PATTERN.sub('', text).strip()
+    if NO_WORDS_PATTERN.match(stripped):
+        return False
+    if RAW_ID_PATTERN.match(stripped):
+        return False
+    if stripped.lower().endswith(ASSET_EXTENSIONS):
+        return False
+    return True
+
+
+def _is_in_source_script(text: str, src_lang: str) -> bool:
+    """Check whether text still contains the source script (only decidable for CJK sources)."""
+    if src_lang not in CJK_SOURCE_CODES:
+        return True
+    return CJK_PATTERN.search(text) is not None
+
+
+def _pack_texts(texts: List[str]) -> List[List[int]]:
+    """Group text indices so each joined group stays under PACK_MAX_CHARS / PACK_MAX_ITEMS."""
+    groups = []
+    current = []
+    size = 0
+    for i, text in enumerate(texts):
+        cost = len(text) + len(PACK_SEPARATOR)
+        if current and (size + cost > PACK_MAX_CHARS or len(current) >= PACK_MAX_ITEMS):
+            groups.append(current)
+            current = []
+            size = 0
+        current.append(i)
+        size += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _split_color_wrapper(text: str) -> Tuple[str, str, str]:
+    """Split a body wrapped in a single color code into (prefix, inner text, suffix)."""
+    match = COLOR_WRAPPER_PATTERN.match(text)
+    if not match or COLOR_CODE_PATTERN.search(match.group(2)):
+        return '', text, ''
+    return match.group(1), match.group(2), match.group(3) or ''
+
+
 class CampaignTranslator:
     """Handles translation of Warcraft III campaign files."""
 
@@ -63,17 +266,25 @@ class CampaignTranslator:
         """
         self.mpqcli_path = mpqcli_path
         self.listfile_path = listfile_path
-        self.config = self._load_config()
+        # Tool paths don't change during a run; stat them once instead of per mpqcli call
+        self.mpqcli_found = os.path.exists(mpqcli_path)
+        self.listfile_found = os.path.exists(listfile_path)
+        self.config = _load_config()
         self.engine = 'google'
-        if self.config and self.config.has_section('General'):
-            try:
-                self.engine = self.config.get('General', 'engine', fallback='google').strip().lower()
-            except (configparser.NoSectionError, configparser.NoOptionError):
-                self.engine = 'google'
+        if 'General' in self.config:
+            self.engine = self.config['General'].get('engine', 'google').strip().lower()
         elif os.getenv("TRANSLATE_ENGINE"):
             self.engine = os.getenv("TRANSLATE_ENGINE").strip().lower()
         self.google_translator = None
         self.llm_translator = None
+
+        # LRU cache of (engine, src, dest, text) -> translation, shared by worker threads
+        self._cache: "OrderedDict[Tuple[str, str, str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_db = self._open_cache_db()
+
+        # Shared by every worker thread so concurrent batches stay under Google's limit
+        self._rate_limiter = RateLimiter(GOOGLE_RATE_LIMIT)
         
         self._init_translators()
 
@@ -85,14 +296,6 @@ class CampaignTranslator:
         for directory in [self.backup_dir, self.protected_dir, self.translated_dir]:
             directory.mkdir(exist_ok=True)
 
-    def _load_config(self) -> configparser.ConfigParser:
-        """Load configuration from config.ini."""
-        config = configparser.ConfigParser()
-        config_file = Path("config.ini")
-        if config_file.exists():
-            config.read(config_file)
-        return config
-
     def _init_translators(self):
         """Initialize translation engines based on config."""
         # Initialize Google Translate first (or if LLM not available)
@@ -122,7 +325,7 @@ class CampaignTranslator:
     def _init_google_translator(self):
         """Initialize Google Translator (Cloud or Free)."""
         api_key = None
-        if self.config and self.config.has_section('GoogleTranslate'):
+        if 'GoogleTranslate' in self.config:
             api_key = self.config['GoogleTranslate'].get('api_key')
         
         if api_key and api_key != 'YOUR_API_KEY_HERE' and CLOUD_TRANSLATE_AVAILABLE:
@@ -130,6 +333,7 @@ class CampaignTranslator:
                 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = api_key
                 self.google_translator = translate.Client()
                 self.use_cloud_api = True
+                self._widen_connection_pool()
                 print("✓ Using Google Cloud Translation API (Official)")
             except Exception as e:
                 print(f"⚠️ Failed to initialize Cloud API: {e}")
@@ -137,70 +341,230 @@ class CampaignTranslator:
         else:
             self._init_free_google()
 
+    def _widen_connection_pool(self):
+        """Size the Cloud client's keep-alive pool for all concurrent batch workers."""
+        try:
+            from requests.adapters import HTTPAdapter
+            pool_size = GOOGLE_CONCURRENCY * MAP_WORKERS
+            self.google_translator._http.mount('https://', HTTPAdapter(pool_maxsize=pool_size))
+        except Exception as e:
+            print(f"⚠️ Could not resize Cloud API connection pool: {e}")
+
     def _init_free_google(self):
         """Initialize free googletrans."""
         if FREE_TRANSLATE_AVAILABLE:
-            self.google_translator = FreeTranslator()
+            # One HTTP/2 keep-alive client for the whole run instead of a handshake per batch
+            self.google_translator = FreeTranslator(http2=True, timeout=GOOGLE_TIMEOUT)
             self.use_cloud_api = False
             print("✓ Using free Google Translate (no API key)")
         else:
             print("❌ No Google Translate library available. Install with 'pip install googletrans==4.0.0rc1'.")
 
+    def _open_cache_db(self) -> Optional[sqlite3.Connection]:
+        """Open (or create) the on-disk translation cache; None if it can't be used."""
+        try:
+            db = sqlite3.connect(TRANSLATION_CACHE_DB, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS translations (key BLOB PRIMARY KEY, translation TEXT NOT NULL) "
+                "WITHOUT ROWID"
+            )
+            return db
+        except sqlite3.Error as e:
+            print(f"⚠️ Translation cache disabled: {e}")
+            return None
+
+    @staticmethod
+    def _cache_digest(key: Tuple[str, str, str, str]) -> bytes:
+        """Fixed-size database key for an (engine, src, dest, text) tuple."""
+        return hashlib.blake2b('\x00'.join(key).encode('utf-8'), digest_size=16).digest()
+
+    def _cache_get(self, key: Tuple[str, str, str, str]) -> Optional[str]:
+        """Return a cached translation (memory first, then disk) and mark it as recently used."""
+        with self._cache_lock:
+            translated = self._cache.get(key)
+            if translated is not None:
+                self._cache.move_to_end(key)
+                return translated
+            if self._cache_db is None:
+                return None
+            row = self._cache_db.execute(
+                "SELECT translation FROM translations WHERE key = ?", (self._cache_digest(key),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def _cache_put(self, key: Tuple[str, str, str, str], translated: str):
+        """Store a translation in memory and write it through to disk."""
+        with self._cache_lock:
+            self._remember(key, translated)
+            if self._cache_db is not None:
+                self._cache_db.execute(
+                    "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)",
+                    (self._cache_digest(key), translated)
+                )
+
+    def _remember(self, key: Tuple[str, str, str, str], translated: str):
+        """Insert into the in-memory LRU, evicting the oldest entry when full (lock held)."""
+        self._cache[key] = translated
+        self._cache.move_to_end(key)
+        if len(self._cache) > TRANSLATION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
     def translate_text(self, text: str, src_lang: str, dest_lang: str) -> str:
         """Translate text using the selected engine."""
-        if not text.strip():
+        if not text.strip() or not _is_translatable(text) or not _is_in_source_script(text, src_lang):
             return text
 
+        # Translate the prose inside a |c...|r wrapper and keep the color code as-is
+        prefix, inner, suffix = _split_color_wrapper(text)
+        if prefix:
+            return prefix + self.translate_text(inner, src_lang, dest_lang) + suffix
+
+        key = (self.engine, src_lang, dest_lang, text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         if self.engine == 'llm' and self.llm_translator:
-            return self.llm_translator.translate_text(text, src_lang, dest_lang)
-        
-        # Fallback to Google
-        return self._translate_google(text, src_lang, dest_lang)
+            translated = self.llm_translator.translate_text(text, src_lang, dest_lang)
+        else:
+            # Fallback to Google
+            translated = self._translate_google(text, src_lang, dest_lang)
 
-    def _translate_google(self, text: str, src_lang: str, dest_lang: str, max_retries: int = 3) -> str:
-        """Translate using Google API."""
-        if not self.google_translator:
-            return text
+        # Failed calls return the input unchanged; don't pin those in the cache
+        if translated != text:
+            self._cache_put(key, translated)
+        return translated
 
+    def translate_text_batch(self, texts: List[str], src_lang: str, dest_lang: str) -> List[str]:
+        """Translate a batch of strings with a single engine call and cache the results."""
+        if self.engine == 'llm' and self.llm_translator:
+            translated = self.llm_translator.translate_batch(
+                texts, src_lang, dest_lang, context="Warcraft III Campaign Text"
+            )
+        else:
+            translated = self._translate_google_batch(texts, src_lang, dest_lang)
+
+        if len(translated) != len(texts):
+            print(f"⚠️ Expected {len(texts)} translations, got {len(translated)}. Keeping originals.")
+            return list(texts)
+
+        for original, result in zip(texts, translated):
+            if result != original:
+                self._cache_put((self.engine, src_lang, dest_lang, original), result)
+        return translated
+
+    def _translate_google(self, text: str, src_lang: str, dest_lang: str, max_retries: int = 3) -> str:
+        """Translate a single string using Google API."""
+        return self._translate_google_batch([text], src_lang, dest_lang, max_retries)[0]
+
+    def _translate_google_batch(self, texts: List[str], src_lang: str, dest_lang: str,
+                                max_retries: int = 3) -> List[str]:
+        """Translate a list of strings, packing short ones together on the free endpoint."""
+        if not self.google_translator or not texts:
+            return list(texts)
+
+        # The Cloud API takes the whole list in one request; googletrans sends one
+        # request per list item, so join groups of strings into a single item there
+        if self.use_cloud_api or len(texts) == 1:
+            return self._request_google(texts, src_lang, dest_lang, max_retries)
+
+        # Each packed group, and each fallback item, is its own rate-limited request
+        results = list(texts)
+        for group in _pack_texts(texts):
+            joined = PACK_SEPARATOR.join(texts[i] for i in group)
+            translated = self._send_google(joined, src_lang, dest_lang, max_retries)
+            parts = [part.strip() for part in translated.split(PACK_TOKEN)]
+            if len(parts) != len(group):
+                # The separator was mangled; translate this group item by item
+                parts = [self._send_google(texts[i], src_lang, dest_lang, max_retries) for i in group]
+            for i, part in zip(group, parts):
+                results[i] = part
+        return results
+
+    def _request_google(self, texts: List[str], src_lang: str, dest_lang: str,
+                        max_retries: int = 3) -> List[str]:
+        """Send a list of strings to Google, taking one rate limiter token per HTTP request."""
+        if self.use_cloud_api:
+            # The Cloud API sends the whole list as a single request
+            return self._send_google(texts, src_lang, dest_lang, max_retries)
+        # googletrans sends one request per list item, so each item is throttled on its own
+        return [self._send_google(text, src_lang, dest_lang, max_retries) for text in texts]
+
+    def _send_google(self, payload: Union[str, List[str]], src_lang: str, dest_lang: str,
+                     max_retries: int = 3) -> Union[str, List[str]]:
+        """
+        Make one rate-limited Google request with retries: a list for the Cloud API,
+        a single string for googletrans. Returns the input unchanged on failure.
+        """
         for attempt in range(max_retries):
+            self._rate_limiter.acquire()
             try:
                 if self.use_cloud_api:
-                    result = self.google_translator.translate(
-                        text, source_language=src_lang, target_language=dest_lang
+                    results = self.google_translator.translate(
+                        payload, source_language=src_lang, target_language=dest_lang
                     )
-                    return result['translatedText']
+                    return [result['translatedText'] for result in results]
                 else:
-                    result = self.google_translator.translate(text, src=src_lang, dest=dest_lang)
-                    return result.text
+                    return self.google_translator.translate(payload, src=src_lang, dest=dest_lang).text
             except Exception as e:
+                if _is_rate_limit_error(e):
+                    self._rate_limiter.penalize()
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
+                    # Full jitter keeps concurrent workers from retrying in lockstep
+                    time.sleep(random.uniform(0, 2 ** attempt))
                 else:
                     print(f"❌ Translation failed: {e}")
-                    return text
-        return text
+                    return payload
+        return payload
 
-    def parse_wts_file(self, wts_path: str) -> Dict[str, str]:
-        """Parse a .wts file."""
+    def parse_wts_file(self, wts_path: str) -> Dict[int, str]:
+        """Parse a .wts file into {string id: body}."""
         strings = {}
         try:
-            with open(wts_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            with open(wts_path, 'rb') as f:
+                data = f.read()
         except Exception:
             return {}
 
-        pattern = r'STRING\s+(\d+)\s*\n\s*\{\s*\n(.*?)\n\s*\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.MULTILINE)
+        # Detect the encoding once for the whole file; bodies are decoded with it below
+        encoding = _detect_encoding(data)
+        # Normalise CRLF and lone CR line endings as text mode did, so bodies carry plain \n
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        # Walk the STRING <id> / { / body / } records with find() and slice;
+        # IDs are stored as ints so writing back sorts without re-parsing them
+        pos = 0
+        while True:
+            start = data.find(b'STRING ', pos)
+            if start < 0:
+                break
+            line_end = data.find(b'\n', start)
+            brace = data.find(b'{', line_end)
+            if line_end < 0 or brace < 0:
+                break
+            body_start = data.find(b'\n', brace) + 1
+            if body_start == 0:
+                break
+            body_end = WTS_BODY_END_PATTERN.search(data, body_start - 1)
+            if body_end is None:
+                break
 
-        for match in matches:
-            strings[match.group(1)] = match.group(2).strip()
+            string_id = data[start + 7:line_end].strip()
+            if string_id.isdigit():
+                strings[int(string_id)] = data[body_start:body_end.start()].decode(encoding, errors='replace').strip()
+            pos = body_end.end()
         return strings
 
-    def write_wts_file(self, wts_path: str, strings: Dict[str, str]):
+    def write_wts_file(self, wts_path: str, strings: Dict[int, str]):
         """Write translated strings back to a .wts file."""
+        parts = [f"STRING {string_id}\n{{\n{text}\n}}\n\n" for string_id, text in sorted(strings.items())]
         with open(wts_path, 'w', encoding='utf-8') as f:
-            for string_id in sorted(strings.keys(), key=int):
-                f.write(f"STRING {string_id}\n{{\n{strings[string_id]}\n}}\n\n")
+            f.write(''.join(parts))
 
     def translate_wts_file(self, wts_path: str, output_path: str, src_lang: str, dest_lang: str) -> int:
         """Translate a .wts file."""
@@ -214,36 +578,58 @@ class CampaignTranslator:
         print(f"   🔤 Found {len(strings)} strings to translate")
         translated_strings = {}
 
-        # Use batch translation for LLM if possible
+        # Copy through blank, non-text and already translated bodies, serve repeats
+        # from the cache, and queue the rest (color-code wrappers removed) for translation
+        texts = {}
+        wrappers = {}
+        skipped = 0
+        for string_id, content in strings.items():
+            if (not content.strip() or not _is_translatable(content)
+                    or not _is_in_source_script(content, src_lang)):
+                translated_strings[string_id] = content
+                skipped += 1
+                continue
+            prefix, inner, suffix = _split_color_wrapper(content)
+            if prefix:
+                wrappers[string_id] = (prefix, suffix)
+            cached = self._cache_get((self.engine, src_lang, dest_lang, inner))
+            if cached is not None:
+                translated_strings[string_id] = cached
+            else:
+                texts[string_id] = inner
+        keys = list(texts)
+        if skipped:
+            print(f"   ⏭️ Skipped {skipped} strings that need no translation")
+
+        # One engine call per batch; batches are network-bound, so run them concurrently
         if self.engine == 'llm' and self.llm_translator:
-            keys = list(strings.keys())
-            values = list(strings.values())
-            batch_size = 20
-            
-            iterator = range(0, len(keys), batch_size)
-            if TQDM_AVAILABLE:
-                iterator = tqdm(iterator, desc="Translating batches", unit="batch")
-            
-            for i in iterator:
-                batch_keys = keys[i:i+batch_size]
-                batch_values = values[i:i+batch_size]
-                
-                translated_batch = self.llm_translator.translate_batch(
-                    batch_values, src_lang, dest_lang, context="Warcraft III Campaign Text"
-                )
-                
-                for k, v in zip(batch_keys, translated_batch):
-                    translated_strings[k] = v
+            batch_size, workers = LLM_BATCH_SIZE, LLM_CONCURRENCY
         else:
-            # Sequential translation for Google
-            items = strings.items()
+            batch_size, workers = GOOGLE_BATCH_SIZE, GOOGLE_CONCURRENCY
+        batches = [keys[i:i+batch_size] for i in range(0, len(keys), batch_size)]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda batch_keys: self.translate_text_batch([texts[k] for k in batch_keys], src_lang, dest_lang),
+                batches
+            )
             if TQDM_AVAILABLE:
-                items = tqdm(items, desc="Translating strings", unit="str")
-            
-            for string_id, content in items:
-                translated_strings[string_id] = self.translate_text(content, src_lang, dest_lang)
-                if not TQDM_AVAILABLE and int(string_id) % 10 == 0:
-                    print(f"   Translating... {string_id}", end='\r')
+                results = tqdm(results, total=len(batches), desc="Translating batches", unit="batch")
+
+            # Without tqdm, report once per finished batch (at most ~100 updates per file)
+            total = len(keys)
+            step = max(1, total // 100)
+            done = 0
+            next_report = step
+            for batch_keys, translated_batch in zip(batches, results):
+                translated_strings.update(zip(batch_keys, translated_batch))
+                done += len(batch_keys)
+                if not TQDM_AVAILABLE and done >= next_report:
+                    print(f"   Translating... {done}/{total}", end='\r')
+                    next_report = done + step
+
+        for string_id, (prefix, suffix) in wrappers.items():
+            translated_strings[string_id] = prefix + translated_strings[string_id] + suffix
 
         self.write_wts_file(output_path, translated_strings)
         print(f"   💾 Saved to {output_path}")
@@ -251,7 +637,7 @@ class CampaignTranslator:
 
     def run_mpqcli(self, args: List[str]) -> Tuple[bool, str]:
         """Run mpqcli.exe and return success flag with combined output."""
-        if not os.path.exists(self.mpqcli_path):
+        if not self.mpqcli_found:
             message = f"mpqcli.exe not found at '{self.mpqcli_path}'"
             print(f"❌ {message}")
             return False, message
@@ -267,11 +653,11 @@ class CampaignTranslator:
             output = (result.stdout or "") + (result.stderr or "")
             return result.returncode == 0, output.strip()
         except FileNotFoundError:
-            message = f"mpqcli.exe could not be executed (FileNotFoundError). Tried command: {' '.join(cmd)}"
+            message = f"mpqcli.exe could not be executed (FileNotFoundError). Tried command: {subprocess.list2cmdline(cmd)}"
             print(f"❌ {message}")
             return False, message
         except subprocess.TimeoutExpired:
-            message = f"mpqcli.exe timed out (300s). Command: {' '.join(cmd)}"
+            message = f"mpqcli.exe timed out (300s). Command: {subprocess.list2cmdline(cmd)}"
             print(f"❌ {message}")
             return False, message
         except Exception as e:
@@ -279,35 +665,134 @@ class CampaignTranslator:
             print(f"❌ {message}")
             return False, message
 
+    def _report_mpqcli_failure(self, title: str, args: List[str], output: str):
+        """Print a failed mpqcli command line and its output."""
+        print(f"❌ {title}")
+        print(f"   Command: {subprocess.list2cmdline([self.mpqcli_path] + args)}")
+        if output:
+            for line in output.splitlines():
+                print(f"   → {line}")
+
     def extract_mpq(self, mpq_path: str, output_dir: str) -> bool:
         """Extract MPQ archive."""
         os.makedirs(output_dir, exist_ok=True)
         args = ['extract', mpq_path, '-o', output_dir]
-        if os.path.exists(self.listfile_path):
+        if self.listfile_found:
             args.extend(['-f', self.listfile_path])
         success, output = self.run_mpqcli(args)
         if not success:
-            print("❌ MPQ extraction failed.")
-            print(f"   Command: {' '.join([self.mpqcli_path] + args)}")
-            if output:
-                for line in output.splitlines():
-                    print(f"   → {line}")
+            self._report_mpqcli_failure("MPQ extraction failed.", args, output)
         return success
 
     def create_mpq(self, source_dir: str, mpq_path: str) -> bool:
         """Create MPQ archive."""
         args = ['create', mpq_path, source_dir]
-        if os.path.exists(self.listfile_path):
+        if self.listfile_found:
             args.extend(['-f', self.listfile_path])
         success, output = self.run_mpqcli(args)
         if not success:
-            print("❌ MPQ creation failed.")
-            print(f"   Command: {' '.join([self.mpqcli_path] + args)}")
-            if output:
-                for line in output.splitlines():
-                    print(f"   → {line}")
+            self._report_mpqcli_failure("MPQ creation failed.", args, output)
+        return success
+
+    def extract_mpq_file(self, mpq_path: str, inner_path: str, output_dir: str) -> bool:
+        """Extract a single file from an MPQ archive (no error output on failure)."""
+        os.makedirs(output_dir, exist_ok=True)
+        if STORMLIB_AVAILABLE:
+            output_path = os.path.join(output_dir, os.path.basename(inner_path))
+            try:
+                with StormLibArchive(mpq_path, read_only=True) as archive:
+                    if archive.extract_file(inner_path, output_path):
+                        return True
+            except OSError:
+                pass
+        success, _ = self.run_mpqcli(['extract', mpq_path, '-o', output_dir, '-f', inner_path])
+        return success
+
+    def patch_mpq(self, mpq_path: str, inner_path: str, file_path: str) -> bool:
+        """
+        Replace a single file inside an existing MPQ archive. The archive is copied
+        first and restored if patching fails, so the entry is never lost.
+        """
+        original_copy = f"{mpq_path}.orig"
+        _copy_file(mpq_path, original_copy)
+        try:
+            if self._replace_mpq_file(mpq_path, inner_path, file_path):
+                return True
+            os.replace(original_copy, mpq_path)
+            print(f"   ↩️ Restored {Path(mpq_path).name} to its original contents.")
+            return False
+        finally:
+            if os.path.exists(original_copy):
+                os.remove(original_copy)
+
+    def _replace_mpq_file(self, mpq_path: str, inner_path: str, file_path: str) -> bool:
+        """Swap one archived file in place, through StormLib or mpqcli remove + add."""
+        if STORMLIB_AVAILABLE:
+            try:
+                with StormLibArchive(mpq_path) as archive:
+                    if archive.replace_file(inner_path, file_path):
+                        return True
+            except OSError:
+                pass
+
+        # mpqcli refuses to add over an existing entry, so drop it first
+        args = ['remove', inner_path, mpq_path]
+        success, output = self.run_mpqcli(args)
+        if not success:
+            self._report_mpqcli_failure("MPQ entry removal failed.", args, output)
+            return False
+        args = ['add', file_path, mpq_path, '-p', inner_path]
+        success, output = self.run_mpqcli(args)
+        if not success:
+            self._report_mpqcli_failure("MPQ patching failed.", args, output)
         return success
 
+    def _extract_map(self, map_file: Path, map_extract_dir: Path) -> str:
+        """
+        Extract what is needed to translate a map.
+        Returns 'wts' if only war3map.wts was extracted, 'full' if the whole
+        archive had to be extracted, or '' on failure.
+        """
+        if self.extract_mpq_file(str(map_file), 'war3map.wts', str(map_extract_dir)):
+            return 'wts'
+        if self.extract_mpq(str(map_file), str(map_extract_dir)):
+            return 'full'
+        return ''
+
+    def _process_map(self, map_file: Path, map_extract_dir: Path, extraction: "Future[str]",
+                     src_code: str, dest_code: str,
+                     mpq_executor: ThreadPoolExecutor) -> Optional["Future[bool]"]:
+        """
+        Translate a single map once its extraction has finished, then hand the
+        repack to the mpqcli pool so this worker can move on to the next map.
+        Returns the repack future, or None if the map was skipped.
+        """
+        print(f"\n   🗺️  Processing: {map_file.name}")
+        extract_mode = extraction.result()
+        if not extract_mode:
+            print(f"   ❌ Failed to extract {map_file.name}. Skipping this map.")
+            return None
+
+        map_wts = map_extract_dir / "war3map.wts"
+        if not map_wts.exists():
+            print(f"   ⚠️ No war3map.wts found in {map_file.name}.")
+            return None
+
+        self.translate_wts_file(str(map_wts), str(map_wts), src_code, dest_code)
+        return mpq_executor.submit(self._repack_map, map_file, map_extract_dir, extract_mode)
+
+    def _repack_map(self, map_file: Path, map_extract_dir: Path, extract_mode: str) -> bool:
+        """Write a translated map back into its archive."""
+        # Patch war3map.wts in place when possible instead of rebuilding the whole archive
+        if extract_mode == 'wts':
+            repacked = self.patch_mpq(str(map_file), 'war3map.wts', str(map_extract_dir / "war3map.wts"))
+        else:
+            repacked = self.create_mpq(str(map_extract_dir), str(map_file))
+        if not repacked:
+            print(f"   ❌ Failed to repack {map_file.name}. See details above.")
+            return False
+        return True
+
     def translate_campaign(self, campaign_path: str, src_lang: str, dest_lang: str):
         """Translate a Warcraft III campaign file (.w3n)."""
         campaign_file = Path(campaign_path)
@@ -315,6 +800,15 @@ class CampaignTranslator:
             print(f"❌ Campaign file not found: {campaign_path}")
             return
 
+        # Resolve language codes once; reject unknown languages before any extraction starts
+        unknown = [lang for lang in (src_lang, dest_lang) if lang not in LANGUAGE_CODES]
+        if unknown:
+            print(f"❌ Unsupported language(s): {', '.join(unknown)}")
+            print(f"   Choose from: {', '.join(LANGUAGE_CODES)}")
+            return
+        src_code = LANGUAGE_CODES[src_lang]
+        dest_code = LANGUAGE_CODES[dest_lang]
+
         print(f"\n{'='*70}")
         print(f"🌍 Translating Campaign: {campaign_file.name}")
         print(f"   Engine: {self.engine.upper()}")
@@ -324,7 +818,7 @@ class CampaignTranslator:
         # Backup
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = self.backup_dir / f"{campaign_file.stem}_{timestamp}{campaign_file.suffix}"
-        shutil.copy2(campaign_path, backup_path)
+        _copy_file(campaign_path, backup_path)
         print(f"💾 Backup created: {backup_path}")
 
         work_dir = Path(f"temp_{campaign_file.stem}_{timestamp}")
@@ -338,38 +832,41 @@ class CampaignTranslator:
                 print("❌ Failed to extract campaign.")
                 return
 
-            # Translate campaign strings
-            campaign_wts = campaign_extract_dir / "war3campaign.wts"
-            if campaign_wts.exists():
-                print(f"\n📝 Step 2: Translating war3campaign.wts...")
-                self.translate_wts_file(
-                    str(campaign_wts), str(campaign_wts),
-                    LANGUAGE_CODES.get(src_lang, 'zh-cn'),
-                    LANGUAGE_CODES.get(dest_lang, 'en')
-                )
-
-            # Process maps
-            print(f"\n📂 Step 3: Processing map files...")
             map_files = list(campaign_extract_dir.glob("*.w3x")) + list(campaign_extract_dir.glob("*.w3m"))
-            
-            for map_file in map_files:
-                print(f"\n   🗺️  Processing: {map_file.name}")
-                map_extract_dir = work_dir / f"map_{map_file.stem}"
-                if not self.extract_mpq(str(map_file), str(map_extract_dir)):
-                    print("   ❌ Failed to extract map archive. Skipping this map.")
-                    continue
-
-                map_wts = map_extract_dir / "war3map.wts"
-                if map_wts.exists():
-                    self.translate_wts_file(
-                        str(map_wts), str(map_wts),
-                        LANGUAGE_CODES.get(src_lang, 'zh-cn'),
-                        LANGUAGE_CODES.get(dest_lang, 'en')
-                    )
-                    if not self.create_mpq(str(map_extract_dir), str(map_file)):
-                        print("   ❌ Failed to repack map archive. See details above.")
-                else:
-                    print(f"   ⚠️ No war3map.wts found.")
+            map_dirs = {map_file: work_dir / f"map_{map_file.stem}" for map_file in map_files}
+
+            # Maps are independent archives; extract/translate/repack them in parallel.
+            # Extractions are queued before war3campaign.wts is translated so mpqcli
+            # unpacks every map while the campaign strings are on the network.
+            with ThreadPoolExecutor(max_workers=MPQCLI_WORKERS) as mpq_executor, \
+                    ThreadPoolExecutor(max_workers=MAP_WORKERS) as executor:
+                extractions = {
+                    map_file: mpq_executor.submit(self._extract_map, map_file, map_dirs[map_file])
+                    for map_file in map_files
+                }
+
+                # Translate campaign strings
+                campaign_wts = campaign_extract_dir / "war3campaign.wts"
+                if campaign_wts.exists():
+                    print(f"\n📝 Step 2: Translating war3campaign.wts...")
+                    self.translate_wts_file(str(campaign_wts), str(campaign_wts), src_code, dest_code)
+
+                # Process maps
+                print(f"\n📂 Step 3: Processing map files...")
+                repacks = list(executor.map(
+                    lambda map_file: self._process_map(
+                        map_file, map_dirs[map_file], extractions[map_file], src_code, dest_code, mpq_executor
+                    ),
+                    map_files
+                ))
+                # Maps must be repacked before the campaign archive is rebuilt
+                failed = [map_file.name for map_file, repack in zip(map_files, repacks)
+                          if repack is not None and not repack.result()]
+
+            if failed:
+                print(f"\n❌ {len(failed)} map(s) could not be repacked: {', '.join(failed)}")
+                print("   Campaign not rebuilt; the original is unchanged.")
+                return
 
             # Repack
             print(f"\n📦 Step 4: Repacking campaign...")
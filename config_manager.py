@@ -4,64 +4,117 @@ Handles loading of external data files and settings.
 """
 
 import json
+import locale
 import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def parse_ini(file_path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Read a simple INI file into {section: {key: value}}.
+    Handles the subset config.ini uses: [sections], key = value, and #/; comments.
+    Keys are lower-cased like configparser does. Files that are not UTF-8 are read
+    in the system code page (e.g. GBK from Chinese Notepad), as configparser did.
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    current: Optional[Dict[str, str]] = None
+    try:
+        raw = Path(file_path).read_bytes()
+    except OSError:
+        return sections
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = raw.decode(locale.getpreferredencoding(False), errors='replace')
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            current = sections.setdefault(line[1:-1].strip(), {})
+            continue
+        key, sep, value = line.partition('=')
+        if not sep:
+            key, sep, value = line.partition(':')
+        if sep and current is not None:
+            current[key.strip().lower()] = value.strip()
+    return sections
+
+
+def _load_json(file_path: Path) -> Any:
+    """Parse a JSON file, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 class ConfigManager:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.system_identifiers = {}
         self.jass_patterns = {}
+
+        # Derived views of jass_patterns, built on first use and shared by all callers
+        self._ui_funcs: Optional[List[bytes]] = None
+        self._code_tokens: Optional[List[bytes]] = None
+        self._blacklisted_strings: Optional[Set[str]] = None
         
         # Ensure data directory exists
         if not self.data_dir.exists():
             self.data_dir.mkdir(parents=True, exist_ok=True)
 
     def load_system_identifiers(self) -> Dict[str, str]:
-        """Load system identifiers from JSON."""
+        """Load system identifiers from JSON (read once)."""
+        if self.system_identifiers:
+            return self.system_identifiers
         file_path = self.data_dir / "system_identifiers.json"
         if file_path.exists():
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.system_identifiers = json.load(f)
+                self.system_identifiers = _load_json(file_path)
             except Exception as e:
                 print(f"⚠️ Error loading system identifiers: {e}")
         return self.system_identifiers
 
     def load_jass_patterns(self) -> Dict[str, Any]:
-        """Load JASS patterns from JSON."""
+        """Load JASS patterns from JSON (read once)."""
+        if self.jass_patterns:
+            return self.jass_patterns
         file_path = self.data_dir / "jass_patterns.json"
         if file_path.exists():
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.jass_patterns = json.load(f)
+                self.jass_patterns = _load_json(file_path)
             except Exception as e:
                 print(f"⚠️ Error loading JASS patterns: {e}")
         return self.jass_patterns
 
     def get_ui_funcs(self) -> List[bytes]:
         """Get UI functions as bytes for JASS scanning."""
-        if not self.jass_patterns:
-            self.load_jass_patterns()
-        
-        funcs = self.jass_patterns.get("ui_funcs", [])
-        return [f.encode('utf-8') for f in funcs]
+        if self._ui_funcs is None:
+            funcs = self.load_jass_patterns().get("ui_funcs", [])
+            self._ui_funcs = [f.encode('utf-8') for f in funcs]
+        return self._ui_funcs
 
     def get_code_tokens(self) -> List[bytes]:
         """Get code tokens as bytes for JASS scanning."""
-        if not self.jass_patterns:
-            self.load_jass_patterns()
-            
-        tokens = self.jass_patterns.get("code_tokens", [])
-        return [t.encode('utf-8') for t in tokens]
+        if self._code_tokens is None:
+            tokens = self.load_jass_patterns().get("code_tokens", [])
+            self._code_tokens = [t.encode('utf-8') for t in tokens]
+        return self._code_tokens
 
     def get_blacklisted_strings(self) -> set:
         """Get blacklisted strings."""
-        if not self.jass_patterns:
-            self.load_jass_patterns()
-            
-        return set(self.jass_patterns.get("blacklisted_strings", []))
+        if self._blacklisted_strings is None:
+            self._blacklisted_strings = set(self.load_jass_patterns().get("blacklisted_strings", []))
+        return self._blacklisted_strings
 
 # Global instance
 config = ConfigManager()
@@ -4,11 +4,13 @@ Handles translation using OpenAI-compatible APIs (OpenAI, OpenRouter, etc.)
 """
 
 import os
+import re
 import time
 import json
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 from pathlib import Path
-import configparser
+
+from config_manager import parse_ini
 
 try:
     from openai import OpenAI
@@ -16,12 +18,63 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Warcraft III color codes, swapped for §n§ placeholders before text is sent to the model
+_COLOR_RE = re.compile(r'\|c[0-9A-Fa-f]{8}|\|r')
+_PLACEHOLDER_RE = re.compile(r'§(\d+)§')
+
+# Markdown code fence some models wrap their JSON reply in
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+
+
+def _protect(text: str) -> Tuple[str, List[str]]:
+    """Replace color codes with numbered placeholders; returns the stripped text and the codes."""
+    codes = []
+    parts = []
+    pos = 0
+    for match in _COLOR_RE.finditer(text):
+        parts.append(text[pos:match.start()])
+        parts.append(f"§{len(codes)}§")
+        codes.append(match.group(0))
+        pos = match.end()
+    if not codes:
+        return text, codes
+    parts.append(text[pos:])
+    return ''.join(parts), codes
+
+
+def _restore(text: str, codes: List[str]) -> Optional[str]:
+    """Put color codes back; returns None if the model dropped or invented a placeholder."""
+    parts = []
+    seen = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(text):
+        index = int(match.group(1))
+        if index >= len(codes):
+            return None
+        parts.append(text[pos:match.start()])
+        parts.append(codes[index])
+        seen.append(index)
+        pos = match.end()
+    if sorted(seen) != list(range(len(codes))):
+        return None
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
 class LLMTranslator:
     def __init__(self, api_key: str = None, base_url: str = None, model: str = "gpt-3.5-turbo"):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
         self.client = None
+        # (text, src_lang, dest_lang, context) -> translation, shared by all batches
+        self._cache: Dict[tuple, str] = {}
         
         if not OPENAI_AVAILABLE:
             print("⚠️ OpenAI library not installed. LLM translation unavailable.")
@@ -46,19 +99,14 @@ class LLMTranslator:
         # Check config.ini
         config_file = Path("config.ini")
         if config_file.exists():
-            try:
-                config = configparser.ConfigParser()
-                config.read(config_file)
-                
-                if 'LLM' in config:
-                    if not self.api_key:
-                        self.api_key = config['LLM'].get('api_key')
-                    if not self.base_url:
-                        self.base_url = config['LLM'].get('base_url')
-                    if 'model' in config['LLM']:
-                        self.model = config['LLM'].get('model')
-            except Exception as e:
-                print(f"⚠️ Error reading config.ini: {e}")
+            llm_config = parse_ini(config_file).get('LLM')
+            if llm_config is not None:
+                if not self.api_key:
+                    self.api_key = llm_config.get('api_key')
+                if not self.base_url:
+                    self.base_url = llm_config.get('base_url')
+                if 'model' in llm_config:
+                    self.model = llm_config['model']
 
     def translate_batch(self, texts: List[str], src_lang: str, dest_lang: str, context: str = "") -> List[str]:
         """
@@ -79,17 +127,39 @@ class LLMTranslator:
         if not texts:
             return []
 
+        # Only send strings that are neither cached nor repeated within this batch
+        misses = list(dict.fromkeys(
+            text for text in texts if (text, src_lang, dest_lang, context) not in self._cache
+        ))
+        if misses:
+            protected = [_protect(text) for text in misses]
+            results = self._request_batch([stripped for stripped, _ in protected], src_lang, dest_lang, context)
+            if len(results) == len(misses):
+                for text, (_, codes), result in zip(misses, protected, results):
+                    if not isinstance(result, str):
+                        continue
+                    result = _restore(result, codes)
+                    if result is not None and result != text:
+                        self._cache[(text, src_lang, dest_lang, context)] = result
+
+        return [self._cache.get((text, src_lang, dest_lang, context), text) for text in texts]
+
+    def _request_batch(self, texts: List[str], src_lang: str, dest_lang: str, context: str) -> List[str]:
+        """Send one batch of texts to the LLM and parse the JSON array it returns."""
         # Prepare the prompt
         system_prompt = f"""You are a professional translator for Warcraft III maps. 
 Translate the following text from {src_lang} to {dest_lang}.
-Maintain all Warcraft III color codes (e.g., |cFFFF0000...|r) and formatting exactly.
+Keep every placeholder such as §0§ or §1§ exactly as written; they stand for formatting codes.
 Do not translate technical terms like 'u00A', 'h001' if they appear to be raw IDs.
 Return ONLY a JSON array of strings, matching the order of the input."""
 
         if context:
             system_prompt += f"\nContext: {context}"
 
-        user_prompt = json.dumps(texts, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            user_prompt = orjson.dumps(texts).decode('utf-8')
+        else:
+            user_prompt = json.dumps(texts, ensure_ascii=False)
 
         try:
             response = self.client.chat.completions.create(
@@ -106,12 +176,11 @@ Return ONLY a JSON array of strings, matching the order of the input."""
             try:
                 # Parse JSON response
                 # Sometimes models wrap JSON in markdown code blocks
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
+                fence = _FENCE_RE.search(content)
+                if fence:
+                    content = fence.group(1)
                 
-                result = json.loads(content)
+                result = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
                 
                 # Handle different JSON structures the model might return
                 if isinstance(result, list):
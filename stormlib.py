@@ -0,0 +1,100 @@
+"""
+StormLib Bindings
+In-process MPQ access through StormLib (the library mpqcli is built on).
+Lets single-file extract/patch operations run without spawning mpqcli.exe.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import sys
+from typing import Optional
+
+IS_WINDOWS = sys.platform == 'win32'
+
+# Library file names searched in the working directory and the system path
+LIBRARY_NAMES = ['StormLib.dll'] if IS_WINDOWS else ['libstorm.so', 'libstorm.dylib']
+
+# StormLib flags (see StormLib.h)
+STREAM_FLAG_READ_ONLY = 0x00000100
+SFILE_OPEN_FROM_MPQ = 0x00000000
+MPQ_FILE_COMPRESS = 0x00000200
+MPQ_FILE_REPLACEEXISTING = 0x80000000
+MPQ_COMPRESSION_ZLIB = 0x02
+MPQ_COMPRESSION_NEXT_SAME = 0xFFFFFFFF
+
+
+def _load_library() -> Optional[ctypes.CDLL]:
+    """Load StormLib if it is installed; StormLib exports are __stdcall on Windows."""
+    loader = ctypes.WinDLL if IS_WINDOWS else ctypes.CDLL
+    candidates = [os.path.abspath(name) for name in LIBRARY_NAMES if os.path.exists(name)]
+    candidates.extend(LIBRARY_NAMES)
+    found = ctypes.util.find_library('StormLib' if IS_WINDOWS else 'storm')
+    if found:
+        candidates.append(found)
+
+    for name in candidates:
+        try:
+            return loader(name)
+        except OSError:
+            continue
+    return None
+
+
+_lib = _load_library()
+STORMLIB_AVAILABLE = _lib is not None
+
+if STORMLIB_AVAILABLE:
+    # Paths on disk are TCHAR (wide on Windows builds); names inside the archive are char
+    _tchar_p = ctypes.c_wchar_p if IS_WINDOWS else ctypes.c_char_p
+
+    _lib.SFileOpenArchive.argtypes = [_tchar_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.POINTER(ctypes.c_void_p)]
+    _lib.SFileOpenArchive.restype = ctypes.c_bool
+    _lib.SFileCloseArchive.argtypes = [ctypes.c_void_p]
+    _lib.SFileCloseArchive.restype = ctypes.c_bool
+    _lib.SFileExtractFile.argtypes = [ctypes.c_void_p, ctypes.c_char_p, _tchar_p, ctypes.c_uint32]
+    _lib.SFileExtractFile.restype = ctypes.c_bool
+    _lib.SFileAddFileEx.argtypes = [ctypes.c_void_p, _tchar_p, ctypes.c_char_p,
+                                    ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
+    _lib.SFileAddFileEx.restype = ctypes.c_bool
+
+
+def _disk_path(path: str):
+    """Convert a filesystem path to StormLib's TCHAR representation."""
+    return path if IS_WINDOWS else os.fsencode(path)
+
+
+class StormLibArchive:
+    """An open MPQ archive handle. Use as a context manager."""
+
+    def __init__(self, mpq_path: str, read_only: bool = False):
+        if not STORMLIB_AVAILABLE:
+            raise OSError("StormLib is not available")
+        self.mpq_path = mpq_path
+        self.handle = ctypes.c_void_p()
+        flags = STREAM_FLAG_READ_ONLY if read_only else 0
+        if not _lib.SFileOpenArchive(_disk_path(mpq_path), 0, flags, ctypes.byref(self.handle)):
+            raise OSError(f"StormLib could not open {mpq_path}")
+
+    def __enter__(self) -> "StormLibArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Flush and close the archive."""
+        if self.handle.value:
+            _lib.SFileCloseArchive(self.handle)
+            self.handle = ctypes.c_void_p()
+
+    def extract_file(self, inner_path: str, output_path: str) -> bool:
+        """Extract one archived file to output_path."""
+        return _lib.SFileExtractFile(self.handle, inner_path.encode('utf-8'),
+                                     _disk_path(output_path), SFILE_OPEN_FROM_MPQ)
+
+    def replace_file(self, inner_path: str, file_path: str) -> bool:
+        """Add file_path to the archive as inner_path, overwriting any existing entry."""
+        return _lib.SFileAddFileEx(self.handle, _disk_path(file_path), inner_path.encode('utf-8'),
+                                   MPQ_FILE_COMPRESS | MPQ_FILE_REPLACEEXISTING,
+                                   MPQ_COMPRESSION_ZLIB, MPQ_COMPRESSION_NEXT_SAME)
@@ -5,16 +5,28 @@ Version 2.2 - External Configuration Support
 Standalone module for translator2.py
 """
 
+import functools
+import mmap
 import os
 import re
+import sys
 import json
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 import chardet
 import ftfy
 
+# Optional Aho-Corasick automaton for multi-identifier lookups
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Import ConfigManager
 try:
     from config_manager import config
@@ -23,17 +35,31 @@ except ImportError:
     CONFIG_AVAILABLE = False
     print("⚠️ config_manager.py not found. Using default identifiers.")
 
-@dataclass
+# A single CJK Unified Ideograph
+CJK_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+# "12. text" lines of the editable dictionary/template files
+INDEX_PREFIX_PATTERN = re.compile(r'^\d+\.\s*')
+INDEX_LINE_PATTERN = re.compile(r'^(\d+)\.\s*(.+)$')
+
+# Number of captured strings fed to chardet when guessing a map's encoding
+ENCODING_SAMPLE_MATCHES = 500
+
+# slots=True (Python 3.10+) drops the per-instance __dict__; older versions get a plain dataclass
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def _write_lines(path: str, lines: List[str]):
+    """Write pre-formatted lines to a UTF-8 text file in one call."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+@dataclass(**DATACLASS_SLOTS)
 class SystemIdentifier:
     identifier: str
     occurrences: List[int]
     translation: str = ""
     index: int = 0
-    pattern_types: List[str] = None
-
-    def __post_init__(self):
-        if self.pattern_types is None:
-            self.pattern_types = []
+    pattern_types: List[str] = field(default_factory=list)
 
 class StringExtractor:
     """Enhanced system identifier extraction engine for complex Warcraft III maps"""
@@ -73,30 +99,87 @@ class StringExtractor:
         (re.compile(rb'"[^"]*"\s*\+\s*"([^"]+)"'), 'concat_part'),
     ]
 
-    # Patterns that indicate a string is a file path and should be skipped
-    PATH_PATTERNS = [
-        re.compile(rb'^[A-Za-z]:[\\/]', re.IGNORECASE),  # Windows absolute path
-        re.compile(rb'^[\\/][\\/]'),  # UNC path
-        re.compile(rb'ReplaceableTextures[\\/]', re.IGNORECASE),
-        re.compile(rb'Sound[s]?[\\/]', re.IGNORECASE),
-        re.compile(rb'Model[s]?[\\/]', re.IGNORECASE),
-        re.compile(rb'Texture[s]?[\\/]', re.IGNORECASE),
-        re.compile(rb'\.(blp|mdl|mdx|tga|mp3|wav|w3m|w3x|slk|txt|ai|j)$', re.IGNORECASE),
-    ]
+    # Literals that must occur in the file for a pattern to match at all.
+    # A cheap `in` check skips the full regex scan on maps that never use the API.
+    # hashtable_key is case-insensitive and has no trigger, so it is always scanned.
+    DETECTION_TRIGGERS = {
+        'string_comparison': (b'LoadStr', b'GetStr'),
+        'stringhash': (b'StringHash',),
+        'loadstr_param': (b'LoadStr',),
+        'savestr_value': (b'SaveStr',),
+        'variable_assign': (b'set',),
+        'ui_direct': (b'DisplayTextToPlayer', b'BJDebugMsg', b'DialogSetMessage'),
+        'concat_part': (b'+',),
+    }
+
+    # Common English variants of standard identifiers, longest first, rewritten to the
+    # standard translation by apply_identifiers_to_translation
+    COMPOUND_VARIATIONS = {
+        chinese: sorted(variants, key=len, reverse=True)
+        for chinese, variants in {
+            '攻击力': ['Attack Power', 'ATK Power', 'Atk Power', 'ATK', 'Atk'],
+            '攻击速度': ['Attack Rate', 'Attack SPD', 'ATK Speed', 'ATK SPD', 'Atk SPD', 'ASPD'],
+            '法强': ['Spell Power', 'Magic Power', 'AP', 'Spell Damage', 'Magic Damage'],
+            '专精': ['Specialty', 'Expertise', 'Proficiency'],
+            '护甲': ['Defence', 'Defense', 'ARM'],
+            '法术抗性': ['Magic Resistance', 'MR', 'Spell Resistance', 'Spell Resist'],
+            '全属性': ['All Attributes', 'Omnistats'],
+            '物理吸血': ['Physical Lifesteal', 'Life Steal', 'Lifesteal', 'Physical Life Steal'],
+            '法术吸血': ['Spell Lifesteal', 'Magic Vamp', 'Spell Life Steal'],
+            '冷却缩减': ['CD Reduction', 'Cooldown Reduction'],
+            '物理暴击': ['Physical Critical', 'Phys Crit'],
+            '法术暴击': ['Spell Critical', 'Magic Crit'],
+            '暴击': ['Critical', 'Critical Strike', 'Crit Strike'],
+            '穿透': ['Pierce', 'Pen'],
+            '物理穿透': ['Physical Pierce', 'Phys Pen'],
+            '法术穿透': ['Spell Pierce', 'Magic Pen'],
+        }.items()
+    }
+
+    # Encodings tried when decoding captured strings (detected encoding goes first)
+    DECODE_ENCODINGS = ['utf-8', 'gb18030', 'gbk', 'gb2312', 'big5']
+    # chardet guesses allowed to go first. Other code pages (big5, euc-kr, latin-1...)
+    # can decode short GBK samples cleanly into the wrong characters.
+    PROMOTABLE_ENCODINGS = frozenset({'utf-8', 'gb18030', 'gbk', 'gb2312'})
+
+    # Markers that indicate a string is a file path and should be skipped.
+    # All are fixed literals, so is_path_like uses bytes methods instead of regex.
+    PATH_SEPARATORS = (b'\\', b'/')
+    PATH_FOLDERS = (b'replaceabletextures\\', b'replaceabletextures/', b'sound\\', b'sound/',
+                    b'sounds\\', b'sounds/', b'model\\', b'model/', b'models\\', b'models/',
+                    b'texture\\', b'texture/', b'textures\\', b'textures/')
+    PATH_EXTENSIONS = (b'.blp', b'.mdl', b'.mdx', b'.tga', b'.mp3', b'.wav', b'.w3m', b'.w3x',
+                       b'.slk', b'.txt', b'.ai', b'.j')
+    PATH_EMBEDDED_EXTENSIONS = (b'.blp', b'.mdl', b'.mdx', b'.mp3')
 
     @staticmethod
+    def detect_match_encodings(all_matches: List[Tuple[int, bytes, str]]) -> List[str]:
+        """
+        Order DECODE_ENCODINGS for this map: maps are usually encoded uniformly, so
+        detect once from the captured strings and try that encoding first when it
+        is UTF-8 or GB; any other guess keeps the fixed order.
+        """
+        sample = b'\n'.join(captured for _, captured, _ in all_matches[:ENCODING_SAMPLE_MATCHES])
+        detected = (chardet.detect(sample).get('encoding') or '').lower()
+        if detected not in StringExtractor.PROMOTABLE_ENCODINGS:
+            return StringExtractor.DECODE_ENCODINGS
+        return [detected] + [enc for enc in StringExtractor.DECODE_ENCODINGS if enc != detected]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_identifiers() -> Dict[str, str]:
-        """Get system identifiers from config or default."""
+        """Get system identifiers from config or default (looked up once per run)."""
         if CONFIG_AVAILABLE:
             return config.load_system_identifiers() or StringExtractor.DEFAULT_IDENTIFIERS
         return StringExtractor.DEFAULT_IDENTIFIERS
 
     @staticmethod
-    def get_blacklisted_strings() -> set:
-        """Get blacklisted strings from config."""
+    @functools.lru_cache(maxsize=1)
+    def get_blacklisted_strings() -> frozenset:
+        """Get blacklisted strings from config (looked up once per run)."""
         if CONFIG_AVAILABLE:
-            return config.get_blacklisted_strings()
-        return set()
+            return frozenset(config.get_blacklisted_strings())
+        return frozenset()
 
     @staticmethod
     def is_path_like(s: bytes) -> bool:
@@ -106,12 +189,22 @@ class StringExtractor:
         
         test_str = s[1:-1] if s.startswith(b'"') and s.endswith(b'"') else s
         
-        for pattern in StringExtractor.PATH_PATTERNS:
-            if pattern.search(test_str):
-                return True
+        # Windows absolute path (C:\ or C:/) or UNC path (\\server)
+        if test_str[1:3] in (b':\\', b':/') and test_str[:1].isalpha():
+            return True
+        if test_str[:1] in StringExtractor.PATH_SEPARATORS and test_str[1:2] in StringExtractor.PATH_SEPARATORS:
+            return True
         
+        test_lower = test_str.lower()
+        if test_lower.endswith(StringExtractor.PATH_EXTENSIONS):
+            return True
+        if any(folder in test_lower for folder in StringExtractor.PATH_FOLDERS):
+            return True
+        
+        # Trailing extensions were handled above; this catches paths with an asset
+        # extension in the middle (e.g. "Abilities\\x.mdx,origin" attachment specs)
         if b'\\' in test_str or b'/' in test_str:
-            if any(ext in test_str.lower() for ext in [b'.blp', b'.mdl', b'.mdx', b'.mp3']):
+            if any(ext in test_lower for ext in StringExtractor.PATH_EMBEDDED_EXTENSIONS):
                 return True
         
         return False
@@ -122,12 +215,12 @@ class StringExtractor:
         if not s or len(s.strip()) < 2:
             return False
         
-        chinese_chars = re.findall(r'[\u4e00-\u9fff]', s)
-        if not chinese_chars:
+        # Only need to know whether there are zero, one, or at least two CJK characters
+        first = CJK_CHAR_PATTERN.search(s)
+        if not first:
             return False
         
-        identifiers = StringExtractor.get_identifiers()
-        if len(chinese_chars) < 2 and s not in identifiers:
+        if not CJK_CHAR_PATTERN.search(s, first.end()) and s not in StringExtractor.get_identifiers():
             return False
         
         blacklist = StringExtractor.get_blacklisted_strings()
@@ -149,11 +242,9 @@ class StringExtractor:
                 print(f"=== SYSTEM IDENTIFIER EXTRACTION ===")
                 print(f"Reading: {war3map_path}")
             
-            with open(war3map_path, 'rb') as f:
-                data = f.read()
-            
+            file_size = os.path.getsize(war3map_path)
             if verbose:
-                print(f"File size: {len(data):,} bytes")
+                print(f"File size: {file_size:,} bytes")
             
             identifiers = {}
             index_counter = 1
@@ -173,16 +264,24 @@ class StringExtractor:
             if verbose:
                 print(f"✓ Pre-loaded {len(identifiers)} standard identifiers")
             
+            # Scan a memory map of the file instead of reading it into one bytes object;
+            # only (offset, captured bytes, pattern type) is kept so the map can be closed
             all_matches = []
-            for pattern, ptype in StringExtractor.DETECTION_PATTERNS:
-                try:
-                    matches = list(pattern.finditer(data))
-                    if matches and verbose:
-                        print(f"Pattern '{ptype}': {len(matches)} raw match(es)")
-                    all_matches.extend([(m, ptype) for m in matches])
-                except Exception as e:
-                    if verbose:
-                        print(f"⚠ Pattern '{ptype}' failed: {e}")
+            if file_size:
+                with open(war3map_path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    for pattern, ptype in StringExtractor.DETECTION_PATTERNS:
+                        triggers = StringExtractor.DETECTION_TRIGGERS.get(ptype)
+                        if triggers and not any(data.find(trigger) != -1 for trigger in triggers):
+                            continue
+                        try:
+                            matches = [(m.start(), m.group(1), ptype) for m in pattern.finditer(data)]
+                            if matches and verbose:
+                                print(f"Pattern '{ptype}': {len(matches)} raw match(es)")
+                            all_matches.extend(matches)
+                        except Exception as e:
+                            if verbose:
+                                print(f"⚠ Pattern '{ptype}' failed: {e}")
             
             if not all_matches:
                 if verbose:
@@ -193,17 +292,24 @@ class StringExtractor:
             skipped_paths = 0
             skipped_invalid = 0
             
-            for match, pattern_type in all_matches:
-                identifier_bytes = match.group(1)
-                
+            encodings = StringExtractor.detect_match_encodings(all_matches)
+            if verbose and encodings[0] != StringExtractor.DECODE_ENCODINGS[0]:
+                print(f"Detected encoding: {encodings[0]}")
+            
+            for match_start, identifier_bytes, pattern_type in all_matches:
                 if StringExtractor.is_path_like(identifier_bytes):
                     skipped_paths += 1
                     if verbose and skipped_paths <= 5:
                         print(f"  Skipping path: {identifier_bytes[:60]}...")
                     continue
                 
+                # Valid UI text needs CJK characters, which never decode from pure ASCII
+                if identifier_bytes.isascii():
+                    skipped_invalid += 1
+                    continue
+                
                 decoded_success = False
-                for encoding in ['utf-8', 'gb18030', 'gbk', 'gb2312', 'big5']:
+                for encoding in encodings:
                     try:
                         identifier_str = identifier_bytes.decode(encoding)
                         
@@ -228,7 +334,7 @@ class StringExtractor:
                         
                         if pattern_type not in identifiers[identifier_str].pattern_types:
                             identifiers[identifier_str].pattern_types.append(pattern_type)
-                        identifiers[identifier_str].occurrences.append(match.start())
+                        identifiers[identifier_str].occurrences.append(match_start)
                         processed += 1
                         decoded_success = True
                         break
@@ -251,20 +357,17 @@ class StringExtractor:
             
             os.makedirs(output_dir, exist_ok=True)
             
-            chinese_path = os.path.join(output_dir, "identifier_chinese.txt")
-            with open(chinese_path, 'w', encoding='utf-8') as f:
-                for ident_obj in sorted(identifiers.values(), key=lambda x: x.index):
-                    f.write(f"{ident_obj.index}. {ident_obj.identifier}\n")
+            # Sort once; each output file is then written with a single writelines()
+            ordered = sorted(identifiers.values(), key=attrgetter('index'))
+            
+            chinese_lines = [f"{ident_obj.index}. {ident_obj.identifier}\n" for ident_obj in ordered]
             
-            english_path = os.path.join(output_dir, "identifier_dictionary.txt")
-            with open(english_path, 'w', encoding='utf-8') as f:
-                f.write("# EDIT THIS FILE - Translate Chinese identifiers to English\n")
-                f.write("# Format: Keep the number, translate the text after '->'\n")
-                f.write("# Example: 1. 攻击力 -> Attack Damage\n\n")
-                for ident_obj in sorted(identifiers.values(), key=lambda x: x.index):
-                    f.write(f"{ident_obj.index}. {ident_obj.identifier} -> {ident_obj.translation}\n")
+            english_lines = [
+                "# EDIT THIS FILE - Translate Chinese identifiers to English\n",
+                "# Format: Keep the number, translate the text after '->'\n",
+                "# Example: 1. 攻击力 -> Attack Damage\n\n",
+            ] + [f"{ident_obj.index}. {ident_obj.identifier} -> {ident_obj.translation}\n" for ident_obj in ordered]
             
-            json_path = os.path.join(output_dir, "identifier_dictionary.json")
             dict_data = {
                 "extraction_date": datetime.now().isoformat(),
                 "source_file": war3map_path,
@@ -277,28 +380,39 @@ class StringExtractor:
                         "occurrences": len(obj.occurrences),
                         "patterns": obj.pattern_types
                     }
-                    for obj in sorted(identifiers.values(), key=lambda x: x.index)
+                    for obj in ordered
                 ]
             }
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(dict_data, f, ensure_ascii=False, indent=2)
+            # json.dump() writes one small chunk per token; encode first and write once
+            json_lines = [json.dumps(dict_data, ensure_ascii=False, indent=2)]
             
-            report_path = os.path.join(output_dir, "system_identifiers_detected.txt")
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write("=" * 60 + "\n")
-                f.write("SYSTEM IDENTIFIER DETECTION REPORT\n")
-                f.write("=" * 60 + "\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Source: {war3map_path}\n")
-                f.write(f"Total Identifiers: {len(identifiers)}\n")
-                f.write(f"Detection Patterns: {len(StringExtractor.DETECTION_PATTERNS)}\n")
-                f.write("=" * 60 + "\n\n")
-                
-                for ident_obj in sorted(identifiers.values(), key=lambda x: x.index):
-                    f.write(f"{ident_obj.index}. '{ident_obj.identifier}' → '{ident_obj.translation}'\n")
-                    f.write(f"   Patterns: {', '.join(ident_obj.pattern_types)}\n")
-                    f.write(f"   Occurrences: {len(ident_obj.occurrences)}\n\n")
+            report_lines = [
+                "=" * 60 + "\n",
+                "SYSTEM IDENTIFIER DETECTION REPORT\n",
+                "=" * 60 + "\n",
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"Source: {war3map_path}\n",
+                f"Total Identifiers: {len(identifiers)}\n",
+                f"Detection Patterns: {len(StringExtractor.DETECTION_PATTERNS)}\n",
+                "=" * 60 + "\n\n",
+            ] + [
+                f"{ident_obj.index}. '{ident_obj.identifier}' → '{ident_obj.translation}'\n"
+                f"   Patterns: {', '.join(ident_obj.pattern_types)}\n"
+                f"   Occurrences: {len(ident_obj.occurrences)}\n\n"
+                for ident_obj in ordered
+            ]
+            
+            outputs = [
+                (os.path.join(output_dir, "identifier_chinese.txt"), chinese_lines),
+                (os.path.join(output_dir, "identifier_dictionary.txt"), english_lines),
+                (os.path.join(output_dir, "identifier_dictionary.json"), json_lines),
+                (os.path.join(output_dir, "system_identifiers_detected.txt"), report_lines),
+            ]
+            
+            # Everything is formatted already; the four files are disjoint, so overlap the disk writes
+            with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+                list(executor.map(lambda output: _write_lines(*output), outputs))
             
             if verbose:
                 print(f"\n✓ Saved outputs to {output_dir}")
@@ -322,12 +436,46 @@ class StringExtractor:
             return set()
         return set(identifiers.keys())
 
+    # (identifier set, its size, lookup index) for the set last passed to check_string_for_identifiers
+    _identifier_index_cache: Tuple = (None, 0, None)
+
+    @staticmethod
+    def _identifier_index(identifier_set: set):
+        """
+        Build (once per identifier set) an Aho-Corasick automaton when pyahocorasick is
+        installed, otherwise a {first character: [identifiers]} index.
+        """
+        cached_set, cached_size, index = StringExtractor._identifier_index_cache
+        if cached_set is identifier_set and cached_size == len(identifier_set):
+            return index
+        
+        if AHOCORASICK_AVAILABLE:
+            index = ahocorasick.Automaton()
+            for ident in identifier_set:
+                if ident:
+                    index.add_word(ident, ident)
+            index.make_automaton()
+        else:
+            index = {}
+            for ident in identifier_set:
+                if ident:
+                    index.setdefault(ident[0], []).append(ident)
+        StringExtractor._identifier_index_cache = (identifier_set, len(identifier_set), index)
+        return index
+
     @staticmethod
     def check_string_for_identifiers(text: str, identifier_set: set) -> List[str]:
         """Check if string contains any system identifiers"""
         if not text or not identifier_set:
             return []
-        found = [ident for ident in identifier_set if ident in text]
+        index = StringExtractor._identifier_index(identifier_set)
+        if AHOCORASICK_AVAILABLE:
+            if not len(index):
+                return []
+            found = list({ident for _, ident in index.iter(text)})
+        else:
+            # Only identifiers starting with a character present in the text can match
+            found = [ident for ch in set(text) for ident in index.get(ch, ()) if ident in text]
         found.sort(key=len, reverse=True)
         return found
 
@@ -335,10 +483,10 @@ class StringExtractor:
     def load_identifier_dictionary(output_dir: str) -> Dict[str, str]:
         """Load identifier dictionary from editable file (strips numbers)"""
         dict_file = os.path.join(output_dir, "identifier_dictionary.txt")
-        
-        if not os.path.exists(dict_file):
-            return {}
-        
+        return StringExtractor._load_cached(dict_file, StringExtractor._parse_identifier_dictionary)
+
+    @staticmethod
+    def _parse_identifier_dictionary(dict_file: str) -> Optional[Dict[str, str]]:
         try:
             with open(dict_file, 'r', encoding='utf-8') as f:
                 lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
@@ -348,7 +496,7 @@ class StringExtractor:
                 # Parse "1. 攻击力 -> Attack Damage"
                 parts = line.split('->')
                 if len(parts) >= 2:
-                    chinese = re.sub(r'^\d+\.\s*', '', parts[0]).strip()
+                    chinese = INDEX_PREFIX_PATTERN.sub('', parts[0]).strip()
                     english = parts[1].strip()
                     if chinese and english:
                         identifier_map[chinese] = english
@@ -357,7 +505,31 @@ class StringExtractor:
             
         except Exception as e:
             print(f"✗ Error loading identifier dictionary: {e}")
+            return None
+
+    # path -> (st_mtime_ns, parsed contents) of the editable dictionary/template files
+    _load_cache: Dict[str, Tuple[int, Dict]] = {}
+
+    @staticmethod
+    def _load_cached(path: str, parse) -> Dict:
+        """
+        Return parse(path), reparsing only when the file's mtime changes.
+        The cached dict is shared between callers and must not be mutated.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+
+        cached = StringExtractor._load_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        result = parse(path)
+        if result is None:
             return {}
+        StringExtractor._load_cache[path] = (mtime, result)
+        return result
 
     # === NEW METHODS FOR CLEAN TRANSLATION TEMPLATE ===
     @staticmethod
@@ -372,23 +544,24 @@ class StringExtractor:
             f.write("# This file contains ONLY the translations to edit.\n")
             f.write("# Example: 1. All Stats\n")
             f.write("#          2. STR\n\n")
-            
-            for ident_obj in sorted(identifiers.values(), key=lambda x: x.index):
-                f.write(f"{ident_obj.index}. {ident_obj.translation}\n")
+            f.writelines([
+                f"{ident_obj.index}. {ident_obj.translation}\n"
+                for ident_obj in sorted(identifiers.values(), key=attrgetter('index'))
+            ])
         
         return template_path
 
     @staticmethod
-    def load_translation_template(output_dir: str) -> Dict[str, str]:
+    def load_translation_template(output_dir: str) -> Dict[int, str]:
         """
         Load edited translations from template file.
-        Returns: {index: translation}
+        Returns: {index: translation} with integer indices
         """
         template_path = os.path.join(output_dir, "identifier_translations.txt")
-        
-        if not os.path.exists(template_path):
-            return {}
-        
+        return StringExtractor._load_cached(template_path, StringExtractor._parse_translation_template)
+
+    @staticmethod
+    def _parse_translation_template(template_path: str) -> Optional[Dict[int, str]]:
         translations = {}
         try:
             with open(template_path, 'r', encoding='utf-8') as f:
@@ -398,20 +571,18 @@ class StringExtractor:
                         continue
                     
                     # Match: "1. All Stats" or "1.All Stats"
-                    match = re.match(r'^(\d+)\.\s*(.+)$', line)
+                    match = INDEX_LINE_PATTERN.match(line)
                     if match:
-                        idx = match.group(1)
-                        translation = match.group(2).strip()
-                        translations[idx] = translation
+                        translations[int(match.group(1))] = match.group(2).strip()
         except Exception as e:
             print(f"⚠️ Warning: Could not load translation template: {e}")
-            return {}
+            return None
         
         return translations
 
     @staticmethod
     def apply_template_translations(identifiers: Dict[str, SystemIdentifier], 
-                                    template_translations: Dict[str, str]) -> Tuple[int, int]:
+                                    template_translations: Dict[int, str]) -> Tuple[int, int]:
         """
         Update identifiers with translations from template.
         Returns: (updated_count, missing_count)
@@ -420,17 +591,39 @@ class StringExtractor:
         missing = 0
         
         for ident_obj in identifiers.values():
-            idx_str = str(ident_obj.index)
-            if idx_str in template_translations:
-                new_translation = template_translations[idx_str]
-                if new_translation and new_translation != ident_obj.translation:
-                    ident_obj.translation = new_translation
-                    updated += 1
-            else:
+            new_translation = template_translations.get(ident_obj.index)
+            if new_translation is None:
                 missing += 1
+            elif new_translation and new_translation != ident_obj.translation:
+                ident_obj.translation = new_translation
+                updated += 1
         
         return updated, missing
 
+    @staticmethod
+    def _replace_with_automaton(data: bytes, replacements: Dict[bytes, bytes], counts: Dict[bytes, int]) -> bytes:
+        """
+        Leftmost-longest replacement in one Aho-Corasick pass. Untouched runs and
+        replacements are joined once at their final size instead of growing a buffer
+        and copying it out. Bytes are mapped 1:1 to str via latin-1 because the
+        automaton works on str keys.
+        """
+        automaton = ahocorasick.Automaton()
+        for key in replacements:
+            automaton.add_word(key.decode('latin-1'), key)
+        automaton.make_automaton()
+        
+        parts = []
+        pos = 0
+        for end, key in automaton.iter_long(data.decode('latin-1')):
+            start = end - len(key) + 1
+            parts.append(data[pos:start])
+            parts.append(replacements[key])
+            counts[key] = counts.get(key, 0) + 1
+            pos = end + 1
+        parts.append(data[pos:])
+        return b''.join(parts)
+
     @staticmethod
     def replace_identifiers_in_code(war3map_data: bytes, identifier_map: Dict[str, str], 
                                       verbose: bool = True) -> Tuple[bytes, int]:
@@ -438,28 +631,48 @@ class StringExtractor:
         if not identifier_map:
             return war3map_data, 0
         
-        modified_data = war3map_data
-        total_replacements = 0
+        replacements = {
+            chinese.encode('utf-8'): english.encode('utf-8')
+            for chinese, english in identifier_map.items() if chinese
+        }
+        if not replacements:
+            return war3map_data, 0
         
-        # Sort by length (longest first)
-        sorted_identifiers = sorted(identifier_map.items(), key=lambda x: len(x[0]), reverse=True)
+        counts = {}
+        if AHOCORASICK_AVAILABLE:
+            modified_data = StringExtractor._replace_with_automaton(war3map_data, replacements, counts)
+        else:
+            # One pass over the file: longest identifiers first in the alternation so a
+            # longer identifier wins over any shorter one it contains
+            pattern = re.compile(b'|'.join(
+                re.escape(key) for key in sorted(replacements, key=len, reverse=True)
+            ))
+            
+            def substitute(match):
+                key = match.group(0)
+                counts[key] = counts.get(key, 0) + 1
+                return replacements[key]
+            
+            modified_data = pattern.sub(substitute, war3map_data)
         
-        for chinese, english in sorted_identifiers:
-            try:
-                chinese_bytes = chinese.encode('utf-8')
-                english_bytes = english.encode('utf-8')
-                
-                count = modified_data.count(chinese_bytes)
-                if count > 0:
-                    modified_data = modified_data.replace(chinese_bytes, english_bytes)
-                    total_replacements += count
-                    if verbose:
-                        print(f"  '{chinese}' → '{english}' ({count}x)")
-            except Exception as e:
-                if verbose:
-                    print(f"  ✗ Error: {e}")
+        if verbose:
+            for key in sorted(counts, key=len, reverse=True):
+                print(f"  '{key.decode('utf-8')}' → '{replacements[key].decode('utf-8')}' ({counts[key]}x)")
         
-        return modified_data, total_replacements
+        return modified_data, sum(counts.values())
+
+    # (identifier map, its size, items longest first) for the map last passed to _sorted_identifiers
+    _sorted_identifiers_cache: Tuple = (None, 0, ())
+
+    @staticmethod
+    def _sorted_identifiers(identifier_map: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        """Identifier map items sorted longest first, computed once per map."""
+        cached_map, cached_size, items = StringExtractor._sorted_identifiers_cache
+        if cached_map is identifier_map and cached_size == len(identifier_map):
+            return items
+        items = tuple(sorted(identifier_map.items(), key=lambda x: len(x[0]), reverse=True))
+        StringExtractor._sorted_identifiers_cache = (identifier_map, len(identifier_map), items)
+        return items
 
     @staticmethod
     def replace_identifiers_in_text(text: str, identifier_map: Dict[str, str]) -> Tuple[str, int]:
@@ -470,10 +683,7 @@ class StringExtractor:
         modified_text = text
         total_replacements = 0
         
-        # Sort by length (longest first)
-        sorted_identifiers = sorted(identifier_map.items(), key=lambda x: len(x[0]), reverse=True)
-        
-        for chinese, english in sorted_identifiers:
+        for chinese, english in StringExtractor._sorted_identifiers(identifier_map):
             count = modified_text.count(chinese)
             if count > 0:
                 modified_text = modified_text.replace(chinese, english)
@@ -488,52 +698,38 @@ class StringExtractor:
         if not manual_translation or not identifier_map:
             return manual_translation, []
         
-        found_identifiers = []
-        for chinese, english in identifier_map.items():
-            if chinese in original_chinese:
-                found_identifiers.append((chinese, english))
+        found_identifiers = [
+            (chinese, identifier_map[chinese])
+            for chinese in StringExtractor.check_string_for_identifiers(original_chinese, identifier_map)
+        ]
         
         if not found_identifiers:
             return manual_translation, []
         
-        result = manual_translation
         replaced = []
         
-        # Direct Chinese replacement
-        found_identifiers.sort(key=lambda x: len(x[0]), reverse=True)
-        for chinese, standard_english in found_identifiers:
-            if chinese in result:
-                count = result.count(chinese)
-                result = result.replace(chinese, standard_english)
-                replaced.append(f"{chinese} ({count}x)")
+        # Direct Chinese replacement in one pass (found_identifiers is longest first,
+        # so a longer identifier wins over a shorter one it contains)
+        standard = dict(found_identifiers)
+        counts = {}
         
-        # Compound variation replacement
-        compound_variations = {
-            '攻击力': ['Attack Power', 'ATK Power', 'Atk Power', 'ATK', 'Atk'],
-            '攻击速度': ['Attack Rate', 'Attack SPD', 'ATK Speed', 'ATK SPD', 'Atk SPD', 'ASPD'],
-            '法强': ['Spell Power', 'Magic Power', 'AP', 'Spell Damage', 'Magic Damage'],
-            '专精': ['Specialty', 'Expertise', 'Proficiency'],
-            '护甲': ['Defence', 'Defense', 'ARM'],
-            '法术抗性': ['Magic Resistance', 'MR', 'Spell Resistance', 'Spell Resist'],
-            '全属性': ['All Attributes', 'Omnistats'],
-            '物理吸血': ['Physical Lifesteal', 'Life Steal', 'Lifesteal', 'Physical Life Steal'],
-            '法术吸血': ['Spell Lifesteal', 'Magic Vamp', 'Spell Life Steal'],
-            '冷却缩减': ['CD Reduction', 'Cooldown Reduction'],
-            '物理暴击': ['Physical Critical', 'Phys Crit'],
-            '法术暴击': ['Spell Critical', 'Magic Crit'],
-            '暴击': ['Critical', 'Critical Strike', 'Crit Strike'],
-            '穿透': ['Pierce', 'Pen'],
-            '物理穿透': ['Physical Pierce', 'Phys Pen'],
-            '法术穿透': ['Spell Pierce', 'Magic Pen'],
-            '法术穿透': ['Spell Pierce', 'Magic Pen'],
-        }
+        def substitute(match):
+            chinese = match.group(0)
+            counts[chinese] = counts.get(chinese, 0) + 1
+            return standard[chinese]
+        
+        pattern = re.compile('|'.join(re.escape(chinese) for chinese, _ in found_identifiers))
+        result = pattern.sub(substitute, manual_translation)
+        for chinese, _ in found_identifiers:
+            if chinese in counts:
+                replaced.append(f"{chinese} ({counts[chinese]}x)")
         
+        # Compound variation replacement
         for chinese, standard_english in found_identifiers:
-            if chinese not in original_chinese or chinese in replaced:
+            if chinese in replaced:
                 continue
             
-            variations = compound_variations.get(chinese, [])
-            for variant in sorted(variations, key=len, reverse=True):
+            for variant in StringExtractor.COMPOUND_VARIATIONS.get(chinese, ()):
                 if variant != standard_english and variant in result:
                     result = result.replace(variant, standard_english)
                     if chinese not in replaced:
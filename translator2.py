@@ -4,15 +4,20 @@ Warcraft III Map Translation Tool with System Identifier & Cross-File Dependency
 Version 9.0 - LLM Support & External Configuration
 """
 
+import codecs
+import functools
 import os
 import re
 import shutil
 import hashlib
 import json
+import mmap
 import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Set
+from typing import AnyStr, Iterable, List, Dict, Optional, Tuple, Set
 from dataclasses import dataclass, asdict, field
 import chardet
 import ftfy
@@ -24,6 +29,27 @@ try:
 except ImportError:
     TQDM_AVAILABLE = False
 
+# Optional C JSON codec for the large extraction files
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional RE2 engine (google-re2) for the large alternations built in mode 4
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# Optional Aho-Corasick automaton for matching many strings at once
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Import custom modules
 try:
     import stringextractor as se
@@ -86,6 +112,21 @@ else:
         b'==', b'!=', b'<=', b'>=', b'and ', b'or ', b'not ',
     ]
 
+SUSPICIOUS_PATTERNS = [
+    b'function ', b'local ', b'set ', b'call ',
+    b'hashtable', b'array', b'takes', b'returns'
+]
+
+def compile_token_alternation(tokens: List[bytes]) -> "re.Pattern":
+    """Compile byte tokens into one alternation so a single search replaces a per-token `in` loop."""
+    if not tokens:
+        return re.compile(rb'(?!)')  # an empty alternation would match everywhere
+    return re.compile(b'|'.join(re.escape(token) for token in tokens))
+
+CODE_TOKENS_RE = compile_token_alternation(CODE_TOKENS)
+UI_FUNCS_RE = compile_token_alternation(UI_FUNCS)
+SUSPICIOUS_RE = compile_token_alternation(SUSPICIOUS_PATTERNS)
+
 IDENTIFIER_PATTERNS = [
     re.compile(rb'^[a-zA-Z_][a-zA-Z0-9_]*$'),
     re.compile(rb'^udg_'),
@@ -94,11 +135,67 @@ IDENTIFIER_PATTERNS = [
     re.compile(rb'^\w+_\w+$'),
 ]
 
+# JASS patterns where strings are used as keys (see scan_jass_dependencies)
+CRITICAL_PATTERNS = [
+    # String comparisons
+    (re.compile(rb'if\s+.*==\s*"(.+?)"', re.IGNORECASE), "string_comparison"),
+    (re.compile(rb'StringHash\s*\(\s*"(.+?)"\s*\)', re.IGNORECASE), "stringhash"),
+    (re.compile(rb'SubString\s*\([^,]+,\s*\d+,\s*\d+\)\s*==\s*"(.+?)"', re.IGNORECASE), "substring_match"),
+    
+    # Hashtable saves (keys are often matched later)
+    (re.compile(rb'SaveStr\s*\([^,]+,\s*\d+,\s*\d+,\s*"(.+?)"\)', re.IGNORECASE), "hashtable_key"),
+    
+    # Variable assignments that look like keys
+    (re.compile(rb'set\s+\w+\s*=\s*"([^"]+)"', re.IGNORECASE), "variable_key"),
+]
+
+FUNCTION_NAME_PATTERN = re.compile(rb'function\s+([a-zA-Z_]\w*)')
+SECTION_HEADER_PATTERN = re.compile(r'^\[(\w+)\]$')
+KEY_VALUE_PATTERN = re.compile(r'(\w+)\s*=\s*"?([^"\n]+)"?')
+NUMBERED_LINE_PATTERN = re.compile(r'^(\d+)\.\s*(.*)$')  # "12. text" lines of the token files
+
 FOURCC_PATTERN = re.compile(rb"^[A-Za-z0-9]{4}$")
+UNESCAPED_QUOTE_RE = re.compile(r'(?<!\\)"')
+CONTROL_CHARS_TABLE = dict.fromkeys(c for c in range(32) if c != 0x09)  # str.translate: delete all but tab
 CJK_RE = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff]')
+CHINESE_CHAR_RE = re.compile(r'[\u4e00-\u9fff]')  # one char is enough; no '+' needed
 TRY_CODECS = ['gb18030', 'gbk', 'gb2312', 'big5', 'utf-8', 'shift-jis', 'euc-kr']
-JASS_ESCAPES = {b'\\', b'"', b'n', b'r', b't', b'b', b'f', b'v', b'a', b'0'}
+CHARDET_MIN_BYTES = 20  # shorter strings skip chardet and use TRY_CODECS directly
+# Byte -> 1 for ASCII identifier characters [A-Za-z0-9_], indexed by byte value
+WORD_CHARS = bytes(1 if (c < 128 and chr(c).isalnum()) or c == 0x5F else 0 for c in range(256))
+
+# Tokens scan_strings reacts to: comments, string literals (group 1 = contents,
+# group 2 = closing quote) and the globals keyword. Unterminated block comments and
+# strings run to the end of the data.
+JASS_SCANNER_RE = re.compile(
+    rb'//[^\n]*'
+    rb'|/\*(?:.*?\*/|.*)'
+    rb'|"([^"\\]*(?:\\.[^"\\]*)*)("?)'
+    rb'|\bglobals\b',
+    re.DOTALL
+)
+ENDGLOBALS_RE = re.compile(rb'\bendglobals\b')
+
 CUSTOM_BOX_KEYS = ['Ubertip', 'Tip', 'Description', 'Hotkey']
+TXT_SCAN_WORKERS = 4  # object-data .txt files read and processed concurrently (dependency scan, mode 4 updates)
+WRITE_BUFFER_SIZE = 1 << 20  # extraction outputs are written one entry at a time; flush them in 1 MiB chunks
+
+# Unicode punctuation legacy code pages can't encode -> ASCII stand-ins (single str.translate pass)
+LEGACY_REPLACEMENTS = str.maketrans({
+    '\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'",
+    '\u201e': '"', '\u201f': '"', '\u2032': "'", '\u2033': '"',
+    '\u2013': '-', '\u2014': '--', '\u2015': '--', '\u2212': '-',
+    '\u2026': '...', '\u22ef': '...',
+    '\u00a0': ' ', '\u202f': ' ', '\u2000': ' ', '\u2001': ' ',
+    '\u2002': ' ', '\u2003': ' ', '\u2004': ' ', '\u2005': ' ',
+    '\u2022': '*', '\u2023': '*', '\u25e6': '*', '\u2043': '*',
+    '\u00b7': '*', '\u30fb': '*',
+    '\u00d7': 'x', '\u00f7': '/', '\u2260': '!=',
+    '\u2192': '->', '\u2190': '<-',
+})
+
+# Numbered translation file path -> (st_mtime_ns, line map), see load_line_map
+_LINE_MAP_CACHE: Dict[str, Tuple[int, Dict[int, str]]] = {}
 
 # --- Data Classes ---
 @dataclass
@@ -118,6 +215,7 @@ class ExtractionMetadata:
     restrict_ui: bool
     extraction_date: str
     version: str = "9.0"
+    file_mtime_ns: Optional[int] = None  # lets reinsertion trust file_hash while the file is untouched
 
 @dataclass
 class ChangeInfo:
@@ -165,10 +263,13 @@ def create_backup(file_path: str, backup_dir: str = "backups") -> Optional[str]:
 
 def calculate_file_hash(file_path: str) -> str:
     """Calculate SHA256 hash of a file."""
-    sha256 = hashlib.sha256()
     try:
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
+            # file_digest (Python 3.11+) runs the read/update loop in C
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, 'sha256').hexdigest()
+            sha256 = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 20), b''):
                 sha256.update(chunk)
         return sha256.hexdigest()
     except Exception as e:
@@ -185,15 +286,12 @@ def open_with_notepad(file_path: str):
 
 def count_lines_in_bytes(data: bytes) -> int:
     """Count number of lines in byte data."""
-    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+    # A final line without a trailing newline still counts
+    return data.count(b'\n') + (1 if data and data[-1] != 0x0A else 0)
 
 def byte_offset_to_line_number(data: bytes, offset: int) -> int:
     """Convert byte offset to line number."""
-    line_num = 1
-    for i in range(min(offset, len(data))):
-        if data[i:i+1] == b'\n':
-            line_num += 1
-    return line_num
+    return data.count(b'\n', 0, max(0, offset)) + 1
 
 def get_context_around_offset(data: bytes, offset: int, context_size: int = 80) -> Tuple[str, str]:
     """Get text context before and after a byte offset."""
@@ -229,36 +327,15 @@ def fix_jass_string(text: str, string_index: int) -> Tuple[str, List[str]]:
         fixes_applied.append("Converted carriage returns to \\n")
     
     # 2. Fix unescaped quotes
-    result = []
-    i = 0
-    quote_fixes = 0
-    while i < len(text):
-        if text[i] == '"':
-            if i == 0 or text[i-1] != '\\':
-                result.append('\\"')
-                quote_fixes += 1
-            else:
-                result.append('"')
-        else:
-            result.append(text[i])
-        i += 1
-    
+    text, quote_fixes = UNESCAPED_QUOTE_RE.subn(r'\\"', text)
     if quote_fixes > 0:
-        text = ''.join(result)
         fixes_applied.append(f"Escaped {quote_fixes} unescaped quote(s)")
     
     # 3. Remove control characters
-    control_chars_removed = 0
-    cleaned = []
-    for char in text:
-        char_code = ord(char)
-        if char_code < 32 and char not in '\t':
-            control_chars_removed += 1
-        else:
-            cleaned.append(char)
-    
+    cleaned = text.translate(CONTROL_CHARS_TABLE)
+    control_chars_removed = len(text) - len(cleaned)
     if control_chars_removed > 0:
-        text = ''.join(cleaned)
+        text = cleaned
         fixes_applied.append(f"Removed {control_chars_removed} control character(s)")
     
     if fixes_applied:
@@ -278,25 +355,150 @@ def compare_line_counts(original_data: bytes, new_data: bytes) -> Dict:
         'new_size': len(new_data)
     }
 
+def multi_replace(text: AnyStr, replacements: Dict[AnyStr, AnyStr]) -> Tuple[AnyStr, int]:
+    """
+    Replace every key of replacements in a single left-to-right pass
+    (leftmost-longest, non-overlapping). Works on str or bytes.
+    Returns (new_text, replacement_count).
+    """
+    replacements = {key: value for key, value in replacements.items() if key}
+    if not text or not replacements:
+        return text, 0
+    
+    is_bytes = isinstance(text, bytes)
+    if AHOCORASICK_AVAILABLE:
+        # The automaton works on str; bytes map 1:1 onto code points through latin-1
+        automaton = ahocorasick.Automaton()
+        for key in replacements:
+            automaton.add_word(key.decode('latin-1') if is_bytes else key, key)
+        automaton.make_automaton()
+        
+        parts = []
+        pos = 0
+        for end, key in automaton.iter_long(text.decode('latin-1') if is_bytes else text):
+            start = end - len(key) + 1
+            parts.append(text[pos:start])
+            parts.append(replacements[key])
+            pos = end + 1
+        parts.append(text[pos:])
+        return (b'' if is_bytes else '').join(parts), (len(parts) - 1) // 2
+    
+    # Longest keys first so a longer key wins over any shorter one it starts with
+    separator = b'|' if is_bytes else '|'
+    pattern = re.compile(separator.join(re.escape(key) for key in sorted(replacements, key=len, reverse=True)))
+    return pattern.subn(lambda match: replacements[match.group(0)], text)
+
+def compile_bulk_pattern(pattern: str):
+    """
+    Compile a pattern with one branch per translated string. RE2 matches it in linear
+    time however many branches there are; falls back to re when RE2 is missing or
+    rejects the pattern.
+    """
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+def build_word_automaton(words: Iterable[str]):
+    """
+    Aho-Corasick automaton over words; each hit's value is (order, word).
+    Returns None when pyahocorasick is missing or there are no words.
+    """
+    words = list(words)
+    if not AHOCORASICK_AVAILABLE or not words:
+        return None
+    automaton = ahocorasick.Automaton()
+    for order, word in enumerate(words):
+        automaton.add_word(word, (order, word))
+    automaton.make_automaton()
+    return automaton
+
+def find_words(automaton, text: str) -> List[str]:
+    """Words of build_word_automaton found in text, each once, in the order they were added."""
+    return [word for _, word in sorted({hit for _, hit in automaton.iter(text)})]
+
+def load_line_map(tokens_file: str) -> Dict[int, str]:
+    """
+    Parse a numbered translation file ("12. text", continuation lines allowed).
+    Reparsed only when the file changes; the returned dict is shared, don't mutate it.
+    """
+    mtime = os.stat(tokens_file).st_mtime_ns
+    cached = _LINE_MAP_CACHE.get(tokens_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    line_map = {}
+    current_num = None
+    current_text = None  # the entry's text, or a list of lines once it has a continuation
+    
+    with open(tokens_file, 'r', encoding='utf-8-sig', newline=None) as f:
+        for line in f:
+            match = NUMBERED_LINE_PATTERN.match(line)
+            if match:
+                if current_num is not None:
+                    line_map[current_num] = current_text if isinstance(current_text, str) else '\n'.join(current_text)
+                current_num = int(match.group(1))
+                current_text = match.group(2)
+            elif current_num is not None and not line.isspace():
+                if isinstance(current_text, str):
+                    current_text = [current_text]
+                current_text.append(line.rstrip())
+    
+    if current_num is not None:
+        line_map[current_num] = current_text if isinstance(current_text, str) else '\n'.join(current_text)
+    
+    _LINE_MAP_CACHE[tokens_file] = (mtime, line_map)
+    return line_map
+
+def load_json(path: str):
+    """Load a UTF-8 JSON file (BOM allowed), through orjson when it is installed."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw.startswith(codecs.BOM_UTF8):
+        raw = raw[len(codecs.BOM_UTF8):]
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(raw.decode('utf-8'))
+
+def write_json_records(path: str, records: Iterable[Dict]):
+    """Write records as a UTF-8 JSON array, one compact record per line, without building the list."""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        separator = b'[\n'
+        for record in records:
+            f.write(separator)
+            if ORJSON_AVAILABLE:
+                f.write(orjson.dumps(record))
+            else:
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+            separator = b',\n'
+        f.write(b'\n]\n' if separator != b'[\n' else b'[]\n')
+
+# The same short literals recur throughout a map; each distinct one is detected once
+@functools.lru_cache(maxsize=65536)
 def decode_cjk_advanced(b: bytes) -> Tuple[Optional[str], Optional[str]]:
     """Advanced decoding using chardet and ftfy."""
-    if not b:
+    # CJK text always has high-bit bytes in every supported codec
+    if not b or b.isascii():
         return None, None
     
-    try:
-        detection = chardet.detect(b)
-        encoding = detection.get('encoding')
-        confidence = detection.get('confidence', 0)
-        if encoding and confidence > 0.7:
-            try:
-                s = b.decode(encoding, errors='strict')
-                s_fixed = ftfy.fix_text(s)
-                if CJK_RE.search(s_fixed):
-                    return s_fixed, encoding
-            except (UnicodeDecodeError, TypeError, LookupError):
-                pass
-    except Exception:
-        pass
+    # chardet can't converge on very short input; go straight to the codec list
+    if len(b) >= CHARDET_MIN_BYTES:
+        try:
+            detection = chardet.detect(b)
+            encoding = detection.get('encoding')
+            confidence = detection.get('confidence', 0)
+            if encoding and confidence > 0.7:
+                try:
+                    s = b.decode(encoding, errors='strict')
+                    s_fixed = ftfy.fix_text(s)
+                    if CJK_RE.search(s_fixed):
+                        return s_fixed, encoding
+                except (UnicodeDecodeError, TypeError, LookupError):
+                    pass
+        except Exception:
+            pass
     
     for enc in TRY_CODECS:
         try:
@@ -311,24 +513,18 @@ def decode_cjk_advanced(b: bytes) -> Tuple[Optional[str], Optional[str]]:
 
 def contains_chinese(text):
     """Check if text contains Chinese characters."""
-    return bool(re.search(r'[\u4e00-\u9fff]+', text))
+    return CHINESE_CHAR_RE.search(text) is not None
 
 def is_word_boundary(data: bytes, idx: int, word: bytes) -> bool:
     """Check if a word exists at a specific index with clear boundaries."""
     n = len(data)
-    if idx < 0 or idx + len(word) > n:
+    end_idx = idx + len(word)
+    if idx < 0 or end_idx > n or not data.startswith(word, idx):
         return False
-    if data[idx:idx+len(word)].lower() != word:
+    if idx > 0 and WORD_CHARS[data[idx - 1]]:
+        return False
+    if end_idx < n and WORD_CHARS[data[end_idx]]:
         return False
-    if idx > 0:
-        prev = data[idx-1:idx]
-        if prev.isalnum() or prev == b'_':
-            return False
-    end_idx = idx + len(word)
-    if end_idx < n:
-        next_char = data[end_idx:end_idx+1]
-        if next_char.isalnum() or next_char == b'_':
-            return False
     return True
 
 def is_likely_code_identifier(raw: bytes) -> bool:
@@ -348,18 +544,11 @@ def analyze_string_context(data: bytes, str_start: int, raw: bytes) -> str:
     """Analyze the context around a string."""
     context_before = data[max(0, str_start - 200):str_start]
     
-    for ui_func in UI_FUNCS:
-        if ui_func in context_before:
-            return "ui"
-    
-    suspicious_patterns = [
-        b'function ', b'local ', b'set ', b'call ',
-        b'hashtable', b'array', b'takes', b'returns'
-    ]
+    if UI_FUNCS_RE.search(context_before):
+        return "ui"
     
-    for pattern in suspicious_patterns:
-        if pattern in context_before[-100:]:
-            return "suspicious"
+    if SUSPICIOUS_RE.search(context_before[-100:]):
+        return "suspicious"
     
     if b'=' in context_before[-50:] and b'set ' in context_before[-100:]:
         return "suspicious"
@@ -370,163 +559,74 @@ def scan_strings(data: bytes, restrict_ui: bool = False, progress_callback=None)
     """Enhanced byte-level scan with improved code detection."""
     out = []
     n = len(data)
-    i = 0
-    in_string = False
-    in_line_comment = False
-    in_block_comment = False
-    in_globals = False
-    in_function = False
-    function_depth = 0
-    str_start = -1
+    pos = 0
     last_progress = 0
     
     try:
-        while i < n:
-            if progress_callback and i - last_progress > 100000:
-                progress_callback(i, n)
-                last_progress = i
+        # The regex engine skips plain code in C; only comments, string literals
+        # and the globals keyword come back to Python
+        while True:
+            match = JASS_SCANNER_RE.search(data, pos)
+            if match is None:
+                break
+            pos = match.end()
+            if progress_callback and pos - last_progress > 100000:
+                progress_callback(pos, n)
+                last_progress = pos
+            
+            raw = match.group(1)
+            if raw is None:
+                if match.group(0) == b'globals':
+                    # Nothing in the globals block is extracted; jump straight past it
+                    end_match = ENDGLOBALS_RE.search(data, pos)
+                    if end_match is None:
+                        break
+                    pos = end_match.end()
+                continue
+            
+            # Unterminated strings are never extracted
+            if not match.group(2):
+                continue
             
-            b0 = data[i:i+1]
-            b1 = data[i+1:i+2]
+            if len(raw) < 2:
+                continue
             
-            if in_line_comment:
-                if b0 == b'\n':
-                    in_line_comment = False
-                i += 1
+            if CODE_TOKENS_RE.search(raw):
                 continue
             
-            if in_block_comment:
-                if b0 == b'*' and b1 == b'/':
-                    in_block_comment = False
-                    i += 2
-                else:
-                    i += 1
+            if is_likely_code_identifier(raw):
                 continue
             
-            if not in_string:
-                if b0 == b'/' and b1 == b'/':
-                    in_line_comment = True
-                    i += 2
-                    continue
-                
-                if b0 == b'/' and b1 == b'*':
-                    in_block_comment = True
-                    i += 2
-                    continue
-                
-                if not in_globals and is_word_boundary(data, i, b'globals'):
-                    in_globals = True
-                    i += 7
-                    continue
-                
-                if in_globals and is_word_boundary(data, i, b'endglobals'):
-                    in_globals = False
-                    i += 10
-                    continue
-                
-                if is_word_boundary(data, i, b'function'):
-                    in_function = True
-                    function_depth += 1
-                    i += 8
-                    continue
-                
-                if is_word_boundary(data, i, b'endfunction'):
-                    function_depth -= 1
-                    if function_depth <= 0:
-                        in_function = False
-                        function_depth = 0
-                    i += 11
-                    continue
-                
-                if b0 == b'"':
-                    if in_globals:
-                        i += 1
-                        continue
-                    in_string = True
-                    str_start = i + 1
-                    i += 1
-                    continue
+            str_start = match.start(1)
+            context = analyze_string_context(data, str_start, raw)
             
-            else:
-                if b0 == b'\\':
-                    if b1 in JASS_ESCAPES:
-                        i += 2
-                        continue
-                    i += 1
-                    continue
-                
-                if b0 == b'"':
-                    str_end = i
-                    raw = data[str_start:str_end]
-                    
-                    if len(raw) < 2:
-                        in_string = False
-                        i += 1
-                        continue
-                    
-                    if any(tok in raw for tok in CODE_TOKENS):
-                        in_string = False
-                        i += 1
-                        continue
-                    
-                    if is_likely_code_identifier(raw):
-                        in_string = False
-                        i += 1
-                        continue
-                    
-                    context = analyze_string_context(data, str_start, raw)
-                    
-                    if restrict_ui and context != "ui":
-                        in_string = False
-                        i += 1
-                        continue
-                    
-                    if context == "suspicious":
-                        in_string = False
-                        i += 1
-                        continue
-                    
-                    s, enc = decode_cjk_advanced(raw)
-                    if s and enc:
-                        out.append(ExtractedString(
-                            start=str_start,
-                            end=str_end,
-                            raw=raw,
-                            text=s,
-                            encoding=enc,
-                            context=context
-                        ))
-                    
-                    in_string = False
-                    i += 1
-                    continue
+            if restrict_ui and context != "ui":
+                continue
             
-            i += 1
+            if context == "suspicious":
+                continue
+            
+            s, enc = decode_cjk_advanced(raw)
+            if s and enc:
+                out.append(ExtractedString(
+                    start=str_start,
+                    end=match.end(1),
+                    raw=raw,
+                    text=s,
+                    encoding=enc,
+                    context=context
+                ))
     
     except Exception as e:
-        print(f" ⚠️ Warning: Error during scan at byte {i}: {e}")
+        print(f" ⚠️ Warning: Error during scan at byte {pos}: {e}")
     
     return out
 
 def sanitize_for_legacy_encoding(text: str) -> str:
     """Enhanced Unicode character replacement."""
-    replacements = {
-        '\u201c': '"', '\u201d': '"', '\u2018': "'", '\u2019': "'",
-        '\u201e': '"', '\u201f': '"', '\u2032': "'", '\u2033': '"',
-        '\u2013': '-', '\u2014': '--', '\u2015': '--', '\u2212': '-',
-        '\u2026': '...', '\u22ef': '...',
-        '\u00a0': ' ', '\u202f': ' ', '\u2000': ' ', '\u2001': ' ',
-        '\u2002': ' ', '\u2003': ' ', '\u2004': ' ', '\u2005': ' ',
-        '\u2022': '*', '\u2023': '*', '\u25e6': '*', '\u2043': '*',
-        '\u00b7': '*', '\u30fb': '*',
-        '\u00d7': 'x', '\u00f7': '/', '\u2260': '!=',
-        '\u2192': '->', '\u2190': '<-',
-    }
-    
-    result = text
-    for unicode_char, replacement in replacements.items():
-        result = result.replace(unicode_char, replacement)
-    return result
+    if text.isascii():
+        return text
+    return text.translate(LEGACY_REPLACEMENTS)
 
 def validate_encoding_compatibility(text: str, encoding: str) -> Tuple[bool, List[str]]:
     """Check if text can be encoded without loss."""
@@ -543,6 +643,13 @@ def validate_encoding_compatibility(text: str, encoding: str) -> Tuple[bool, Lis
                     problematic.append(char)
         return False, problematic
 
+def encode_for_output(text: str, encoding: str) -> Tuple[bytes, bool]:
+    """Encode text strictly, dropping unencodable characters on failure. Returns (bytes, lossy)."""
+    try:
+        return text.encode(encoding, errors='strict'), False
+    except UnicodeEncodeError:
+        return text.encode(encoding, errors='ignore'), True
+
 def write_change_report(changes: List[ChangeInfo], output_path: str):
     """Write a detailed report of all changes."""
     try:
@@ -617,31 +724,11 @@ def scan_jass_dependencies(data: bytes) -> Dict[str, List[str]]:
     """
     dependencies = {}
     
-    # Patterns where strings are used as keys
-    CRITICAL_PATTERNS = [
-        # String comparisons
-        (re.compile(rb'if\s+.*==\s*"(.+?)"', re.IGNORECASE), "string_comparison"),
-        (re.compile(rb'StringHash\s*\(\s*"(.+?)"\s*\)', re.IGNORECASE), "stringhash"),
-        (re.compile(rb'SubString\s*\([^,]+,\s*\d+,\s*\d+\)\s*==\s*"(.+?)"', re.IGNORECASE), "substring_match"),
-        
-        # Hashtable saves (keys are often matched later)
-        (re.compile(rb'SaveStr\s*\([^,]+,\s*\d+,\s*\d+,\s*"(.+?)"\)', re.IGNORECASE), "hashtable_key"),
-        
-        # Variable assignments that look like keys
-        (re.compile(rb'set\s+\w+\s*=\s*"([^"]+)"', re.IGNORECASE), "variable_key"),
-    ]
-    
-    # Get the JASS content as string for regex scanning
-    try:
-        jass_str = data.decode('utf-8', errors='ignore')
-        jass_bytes = jass_str.encode('utf-8', errors='ignore')
-    except:
-        return dependencies
-    
+    # The patterns are bytes patterns, so they run on the raw data (bytes or mmap)
+    # directly and match offsets line up with it
     for pattern, context in CRITICAL_PATTERNS:
         try:
-            # Decode pattern to string for matching, then encode matches
-            matches = pattern.finditer(jass_bytes)
+            matches = pattern.finditer(data)
             for match in matches:
                 try:
                     # Decode the matched string properly
@@ -663,13 +750,48 @@ def scan_jass_dependencies(data: bytes) -> Dict[str, List[str]]:
 
 def extract_surrounding_function_name(data: bytes, offset: int) -> Optional[str]:
     """Extract the function name containing the given offset."""
-    # Look backwards for 'function' keyword
-    search_window = data[max(0, offset - 500):offset]
-    func_match = re.search(rb'function\s+([a-zA-Z_]\w*)', search_window)
+    # Look backwards for the nearest 'function' keyword without copying the window
+    idx = data.rfind(b'function', max(0, offset - 500), offset)
+    # Nothing nearby, or the nearest keyword is an 'endfunction' (offset is outside a function)
+    if idx < 0 or (idx > 0 and WORD_CHARS[data[idx - 1]]):
+        return None
+    func_match = FUNCTION_NAME_PATTERN.match(data, idx, offset)
     if func_match:
         return func_match.group(1).decode('utf-8', errors='ignore')
     return None
 
+def scan_txt_dependencies(txt_file: str, jass_deps: Dict[str, List[str]], automaton=None) -> List[Tuple[str, str, str]]:
+    """
+    Find JASS-critical strings in one object-data text file.
+    Returns (chinese_str, key, value) hits in file order.
+    """
+    hits = []
+    with open(txt_file, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    
+    for line in lines:
+        stripped = line.strip()
+        
+        # Section headers
+        if SECTION_HEADER_PATTERN.match(stripped):
+            continue
+        
+        # Key-value pairs (both quoted and unquoted)
+        for match in KEY_VALUE_PATTERN.finditer(stripped):
+            key = match.group(1)
+            value = match.group(2)
+            
+            # Check if any JASS-critical strings appear in this value
+            if automaton is not None:
+                # Each string counts once per value, in jass_deps order like the plain loop
+                found = find_words(automaton, value)
+            else:
+                found = [chinese_str for chinese_str in jass_deps if chinese_str in value]
+            
+            hits.extend((chinese_str, key, value) for chinese_str in found)
+    
+    return hits
+
 def build_dependency_graph(j_path: str, txt_files: List[str]) -> Dict[str, SharedString]:
     """
     Builds a graph of strings that must be translated identically
@@ -679,9 +801,12 @@ def build_dependency_graph(j_path: str, txt_files: List[str]) -> Dict[str, Share
     
     # Scan JASS for critical strings
     print(f"🔍 Scanning JASS file for string dependencies...")
-    with open(j_path, 'rb') as f:
-        jass_data = f.read()
-    jass_deps = scan_jass_dependencies(jass_data)
+    jass_deps = {}
+    if os.path.getsize(j_path):
+        # Map the file instead of reading a full copy into memory
+        with open(j_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as jass_data:
+            jass_deps = scan_jass_dependencies(jass_data)
     
     if not jass_deps:
         print("✓ No critical string dependencies detected.")
@@ -693,41 +818,28 @@ def build_dependency_graph(j_path: str, txt_files: List[str]) -> Dict[str, Share
     if len(jass_deps) > 5:
         print(f"  ... and {len(jass_deps) - 5} more")
     
-    # Scan text files for matching strings
-    for txt_file in txt_files:
-        if not os.path.exists(txt_file):
-            continue
-            
-        with open(txt_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        current_section = None
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
-            
-            # Section headers
-            section_match = re.match(r'^\[(\w+)\]$', stripped)
-            if section_match:
-                current_section = section_match.group(1)
-                continue
-            
-            # Key-value pairs (both quoted and unquoted)
-            for match in re.finditer(r'(\w+)\s*=\s*"?([^"\n]+)"?', stripped):
-                key = match.group(1)
-                value = match.group(2)
-                
-                # Check if any JASS-critical strings appear in this value
-                for chinese_str in jass_deps:
-                    if chinese_str in value:
-                        if chinese_str not in graph:
-                            graph[chinese_str] = SharedString(
-                                chinese_original=chinese_str,
-                                found_in_jass=True,
-                                found_in_txt=True,
-                                jass_contexts=jass_deps[chinese_str],
-                                is_color_code='|c' in value
-                            )
-                        graph[chinese_str].txt_contexts.append((os.path.basename(txt_file), key))
+    # One automaton over all critical strings finds every one of them in a value in a single pass
+    automaton = build_word_automaton(jass_deps)
+    
+    # Scan text files for matching strings; files are independent, so read and scan them
+    # concurrently and merge the hits in file order (same graph as a sequential pass)
+    existing_files = [txt_file for txt_file in txt_files if os.path.exists(txt_file)]
+    if not existing_files:
+        return graph
+    
+    with ThreadPoolExecutor(max_workers=min(TXT_SCAN_WORKERS, len(existing_files))) as executor:
+        results = executor.map(lambda txt_file: scan_txt_dependencies(txt_file, jass_deps, automaton), existing_files)
+        for txt_file, hits in zip(existing_files, results):
+            for chinese_str, key, value in hits:
+                if chinese_str not in graph:
+                    graph[chinese_str] = SharedString(
+                        chinese_original=chinese_str,
+                        found_in_jass=True,
+                        found_in_txt=True,
+                        jass_contexts=jass_deps[chinese_str],
+                        is_color_code='|c' in value
+                    )
+                graph[chinese_str].txt_contexts.append((os.path.basename(txt_file), key))
     
     return graph
 
@@ -743,8 +855,11 @@ def mode4_synchronized_dependency_translation(j_path: str, txt_files: List[str],
     print("are translated identically in all text files to prevent")
     print("breaking item effects, abilities, and triggers.\n")
     
+    # Check each text file once; every step below works on the ones that exist
+    existing_files = [txt_file for txt_file in txt_files if os.path.isfile(txt_file)]
+    
     # Step 1: Build dependency graph
-    graph = build_dependency_graph(j_path, txt_files)
+    graph = build_dependency_graph(j_path, existing_files)
     
     if not graph:
         print("No dependencies to synchronize. Use Mode 2 or 3 instead.")
@@ -767,56 +882,41 @@ def mode4_synchronized_dependency_translation(j_path: str, txt_files: List[str],
         return False
     
     try:
-        with open(jass_json_file, 'r', encoding='utf-8') as f:
-            jass_extraction = json.load(f)
+        jass_extraction = load_json(jass_json_file)
         
-        with open(jass_tokens_file, 'r', encoding='utf-8-sig', newline=None) as f:
-            trans_content = f.read()
+        # Build translation map from extraction data
+        line_map = load_line_map(jass_tokens_file)
     except Exception as e:
         print(f"✗ Error reading JASS data: {e}")
         return False
     
-    # Build translation map from extraction data
-    trans_lines = trans_content.split('\n')
-    line_map = {}
-    current_num = None
-    current_text = []
-    
-    for line in trans_lines:
-        match = re.match(r'^(\d+)\.\s*(.*)', line)
-        if match:
-            if current_num is not None:
-                line_map[current_num] = ' '.join(current_text)
-            current_num = int(match.group(1))
-            current_text = [match.group(2)]
-        elif current_num is not None and line.strip():
-            current_text.append(line.rstrip())
-    
-    if current_num is not None:
-        line_map[current_num] = '\n'.join(current_text)
-    
     # Map original strings to their translations
     for idx, extract in enumerate(jass_extraction, 1):
         if idx in line_map:
             original = extract.get('original', '')
-            translation = line_map[idx]
+            # Synchronized strings go into single-line .txt values and JASS literals
+            translation = line_map[idx].replace('\n', ' ')
             
             # Only add if translation is not empty and not identical to original
             if translation and translation.strip() and translation != original:
                 # Check if this string is in our dependency graph
-                for chinese_str in graph:
-                    if chinese_str == original:
-                        graph[chinese_str].english_translation = translation
-                        break
+                node = graph.get(original)
+                if node is not None:
+                    node.english_translation = translation
+    
+    # Translated strings in graph order; every apply step below works from this
+    synced_translations = {
+        chinese_str: data.english_translation
+        for chinese_str, data in graph.items() if data.english_translation
+    }
     
     # Show what we found
     print("\n📋 Synchronization mapping:")
-    synced = 0
+    synced = len(synced_translations)
     missing = 0
     for chinese_str, data in graph.items():
         if data.english_translation:
             print(f"  ✓ {chinese_str} → {data.english_translation}")
-            synced += 1
         else:
             print(f"  ⚠ {chinese_str} - No translation found!")
             missing += 1
@@ -835,86 +935,88 @@ def mode4_synchronized_dependency_translation(j_path: str, txt_files: List[str],
     
     # Backup files
     create_backup(j_path)
-    for txt_file in txt_files:
-        if os.path.exists(txt_file):
-            create_backup(txt_file)
+    for txt_file in existing_files:
+        create_backup(txt_file)
     
     # Update JASS file
     print("\n  Updating JASS...")
     with open(j_path, 'rb') as f:
         jass_content = f.read()
     
-    # Decode to string for replacement, then re-encode
-    jass_str = jass_content.decode('utf-8', errors='ignore')
-    jass_replacements = 0
+    # Replace in string literals (handle both simple and escaped quotes), all in one pass.
+    # Literals are matched as UTF-8 bytes, so the file itself is never decoded or re-encoded.
+    literal_replacements = {}
+    for chinese_str, english in synced_translations.items():
+        literal_replacements.setdefault(f'"{chinese_str}"'.encode('utf-8'), f'"{english}"'.encode('utf-8'))
+        old_escaped = chinese_str.replace('"', '\\"')
+        if old_escaped != chinese_str:
+            new_escaped = english.replace('"', '\\"')
+            literal_replacements.setdefault(f'"{old_escaped}"'.encode('utf-8'), f'"{new_escaped}"'.encode('utf-8'))
     
-    for chinese_str, data in graph.items():
-        if data.english_translation:
-            # Replace in string literals (handle both simple and escaped quotes)
-            old_pattern = f'"{chinese_str}"'
-            new_pattern = f'"{data.english_translation}"'
-            
-            # Count occurrences before replacement
-            count_before = jass_str.count(old_pattern)
-            jass_str = jass_str.replace(old_pattern, new_pattern)
-            
-            # Also check for patterns with escaped quotes if needed
-            if count_before == 0:
-                old_escaped = chinese_str.replace('"', '\\"')
-                new_escaped = data.english_translation.replace('"', '\\"')
-                old_pattern_escaped = f'"{old_escaped}"'
-                new_pattern_escaped = f'"{new_escaped}"'
-                jass_str = jass_str.replace(old_pattern_escaped, new_pattern_escaped)
-            
-            jass_replacements += jass_str.count(data.english_translation)
+    jass_content, jass_replacements = multi_replace(jass_content, literal_replacements)
     
     jass_output = os.path.join(out_dir, os.path.basename(j_path))
     os.makedirs(out_dir, exist_ok=True)
     with open(jass_output, 'wb') as f:
-        f.write(jass_str.encode('utf-8', errors='ignore'))
+        f.write(jass_content)
     
-    print(f"  ✓ JASS: Applied synchronized translations")
+    print(f"  ✓ JASS: Applied {jass_replacements} synchronized translations")
     
     # Update text files
-    txt_updated = 0
-    for txt_file in txt_files:
-        if not os.path.exists(txt_file):
-            continue
-        
-        print(f"\n  Updating {os.path.basename(txt_file)}...")
+    # Handle both quoted and unquoted values (key = "value" or key=value) for every
+    # synchronized string with one pattern; longest strings first so a string wins
+    # over a shorter one it starts with
+    kv_alternation = '|'.join(
+        re.escape(chinese_str) for chinese_str in sorted(synced_translations, key=len, reverse=True)
+    ) or '(?!)'  # an empty alternation would match every key
+    kv_pattern = compile_bulk_pattern(rf'(\w+\s*=\s*"?)({kv_alternation})(.*?"?)')
+    
+    def kv_replacement(match):
+        return match.group(1) + synced_translations[match.group(2)] + match.group(3)
+    
+    # Color-coded strings (|cAARRGGBB text|r) likewise share one pattern
+    color_translations = {
+        chinese_str: english for chinese_str, english in synced_translations.items() if graph[chinese_str].is_color_code
+    }
+    color_pattern = None
+    if color_translations:
+        color_alternation = '|'.join(
+            re.escape(chinese_str) for chinese_str in sorted(color_translations, key=len, reverse=True)
+        )
+        color_pattern = compile_bulk_pattern(rf'(\|c[0-9a-fA-F]{{8}})({color_alternation})(\|r)')
+    
+    def color_replacement(match):
+        return match.group(1) + color_translations[match.group(2)] + match.group(3)
+    
+    def update_txt_file(txt_file):
+        """Apply the synchronized translations to one text file; returns the replacement count."""
         with open(txt_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        replacements = 0
-        for chinese_str, data in graph.items():
-            if data.english_translation:
-                # Handle both quoted and unquoted values
-                # Pattern: key = "value" or key=value
-                pattern = rf'(\w+\s*=\s*"?)({re.escape(chinese_str)})(.*?"?)'
-                replacement = rf'\1{data.english_translation}\3'
-                new_content = re.sub(pattern, replacement, content)
-                
-                if new_content != content:
-                    replacements += new_content.count(data.english_translation) - content.count(data.english_translation)
-                    content = new_content
-                
-                # Special handling for color-coded strings
-                if data.is_color_code:
-                    pattern = rf'(\|c[0-9a-fA-F]{{8}}){re.escape(chinese_str)}(\|r)'
-                    replacement = rf'\1{data.english_translation}\2'
-                    new_content = re.sub(pattern, replacement, content)
-                    if new_content != content:
-                        replacements += new_content.count(data.english_translation) - content.count(data.english_translation)
-                        content = new_content
+        content, replacements = kv_pattern.subn(kv_replacement, content)
+        
+        # Special handling for color-coded strings; skip the pass when the file has no color codes
+        if color_pattern is not None and '|c' in content:
+            content, count = color_pattern.subn(color_replacement, content)
+            replacements += count
         
         if replacements > 0:
             output_file = os.path.join(out_dir, os.path.basename(txt_file))
             with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
                 f.write(content)
-            print(f"  ✓ Applied {replacements} synchronized translations")
-            txt_updated += 1
-        else:
-            print(f"  - No changes needed")
+        return replacements
+    
+    # Files are independent: update them concurrently and report in file order
+    txt_updated = 0
+    if existing_files:
+        with ThreadPoolExecutor(max_workers=min(TXT_SCAN_WORKERS, len(existing_files))) as executor:
+            for txt_file, replacements in zip(existing_files, executor.map(update_txt_file, existing_files)):
+                print(f"\n  Updating {os.path.basename(txt_file)}...")
+                if replacements > 0:
+                    print(f"  ✓ Applied {replacements} synchronized translations")
+                    txt_updated += 1
+                else:
+                    print(f"  - No changes needed")
     
     # Step 4: Summary
     print("\n" + "="*70)
@@ -949,7 +1051,7 @@ def extract_chinese_from_txt_file(input_file: str, output_dir: str, preserve_cus
             if not stripped:
                 continue
             
-            section_match = re.match(r'^\[(\w+)\]$', stripped)
+            section_match = SECTION_HEADER_PATTERN.match(stripped)
             if section_match:
                 current_section = section_match.group(1)
                 continue
@@ -995,10 +1097,9 @@ def extract_chinese_from_txt_file(input_file: str, output_dir: str, preserve_cus
         json_output = os.path.join(output_dir, f"{base_name}.json")
         txt_output = os.path.join(output_dir, f"{base_name}_chinese.txt")
         
-        with open(json_output, 'w', encoding='utf-8') as f:
-            json.dump(extractions, f, ensure_ascii=False, indent=2)
+        write_json_records(json_output, extractions)
         
-        with open(txt_output, 'w', encoding='utf-8', newline='\n') as f:
+        with open(txt_output, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER_SIZE) as f:
             for idx, text in enumerate(chinese_only, 1):
                 f.write(f"{idx}. {text}\n")
         
@@ -1047,6 +1148,7 @@ def extract_war3map_j(j_path: str, out_dir: str, restrict_ui: bool = False, dete
     try:
         with open(j_path, 'rb') as f:
             data = f.read()
+            file_mtime_ns = os.fstat(f.fileno()).st_mtime_ns
         
         file_hash = hashlib.sha256(data).hexdigest()
         file_size = len(data)
@@ -1109,64 +1211,62 @@ def extract_war3map_j(j_path: str, out_dir: str, restrict_ui: bool = False, dete
             file_size=file_size,
             string_count=len(tokens),
             restrict_ui=restrict_ui,
-            extraction_date=datetime.now().isoformat()
+            extraction_date=datetime.now().isoformat(),
+            file_mtime_ns=file_mtime_ns
         )
         
         with open(os.path.join(out_dir, f"{base}_metadata.json"), 'w', encoding='utf-8') as f:
             json.dump(asdict(metadata), f, indent=2, ensure_ascii=False)
         
+        # Identifiers in each token, looked up once for both the token file and the JSON
+        if identifier_set:
+            token_identifiers = [se.StringExtractor.check_string_for_identifiers(t.text, identifier_set) for t in tokens]
+        else:
+            token_identifiers = [[]] * len(tokens)
+        
         # Write tokens with identifier warnings
         tokens_txt_path = os.path.join(out_dir, f"{base}_chinese.txt")
-        with open(tokens_txt_path, 'w', encoding='utf-8', newline='\n') as f:
-            for idx, t in enumerate(tokens, 1):
+        with open(tokens_txt_path, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER_SIZE) as f:
+            for idx, (t, found_ids) in enumerate(zip(tokens, token_identifiers), 1):
                 escaped = t.text.replace('\n', '\\n').replace('\r', '\\r')
                 
                 # Mark strings containing identifiers
-                if identifier_set:
-                    found_ids = se.StringExtractor.check_string_for_identifiers(t.text, identifier_set)
-                    if found_ids:
-                        f.write(f"{idx}. {escaped} ⚠️ [{', '.join(found_ids)}]\n")
-                    else:
-                        f.write(f"{idx}. {escaped}\n")
+                if found_ids:
+                    f.write(f"{idx}. {escaped} ⚠️ [{', '.join(found_ids)}]\n")
                 else:
                     f.write(f"{idx}. {escaped}\n")
         
-        extractions_json = []
-        for idx, t in enumerate(tokens, 1):
-            extraction_data = {
-                'index': idx,
-                'byte_start': t.start,
-                'byte_end': t.end,
-                'encoding': t.encoding,
-                'original': t.text,
-                'raw_hex': t.raw.hex(),
-                'length': len(t.raw),
-                'context': t.context
-            }
-            
-            if identifier_set:
-                found_ids = se.StringExtractor.check_string_for_identifiers(t.text, identifier_set)
+        def extraction_records():
+            for idx, (t, found_ids) in enumerate(zip(tokens, token_identifiers), 1):
+                extraction_data = {
+                    'index': idx,
+                    'byte_start': t.start,
+                    'byte_end': t.end,
+                    'encoding': t.encoding,
+                    'original': t.text,
+                    'raw_hex': t.raw.hex(),
+                    'length': len(t.raw),
+                    'context': t.context
+                }
+                
                 if found_ids:
                     extraction_data['contains_identifiers'] = found_ids
-            
-            extractions_json.append(extraction_data)
+                
+                yield extraction_data
         
         json_output = os.path.join(out_dir, f"{base}.json")
-        with open(json_output, 'w', encoding='utf-8') as f:
-            json.dump(extractions_json, f, ensure_ascii=False, indent=2)
+        write_json_records(json_output, extraction_records())
         
-        map_data = []
-        for t in tokens:
-            map_data.append({
+        write_json_records(os.path.join(out_dir, f"{base}_map.json"), (
+            {
                 'start': t.start,
                 'end': t.end,
                 'encoding': t.encoding,
                 'raw_hex': t.raw.hex(),
                 'length': len(t.raw)
-            })
-        
-        with open(os.path.join(out_dir, f"{base}_map.json"), 'w', encoding='utf-8') as f:
-            json.dump(map_data, f, indent=2)
+            }
+            for t in tokens
+        ))
         
         print(f"\n ✓ Extracted {len(tokens)} Chinese strings from {base}")
         
@@ -1214,8 +1314,7 @@ def reinsert_translations_txt(original_file: str, json_file: str, translated_fil
         return False
     
     try:
-        with open(json_file, 'r', encoding='utf-8-sig') as f:
-            extractions = json.load(f)
+        extractions = load_json(json_file)
     except json.JSONDecodeError as e:
         print(f" ✗ ERROR: {json_file} is not valid JSON!")
         print(f"   Details: {e}")
@@ -1226,30 +1325,11 @@ def reinsert_translations_txt(original_file: str, json_file: str, translated_fil
         return False
     
     try:
-        with open(translated_file, 'r', encoding='utf-8-sig', newline=None) as f:
-            content = f.read()
+        line_map = load_line_map(translated_file)
     except Exception as e:
         print(f" ✗ ERROR reading {translated_file}: {e}")
         return False
     
-    trans_lines = content.split('\n')
-    line_map = {}
-    current_num = None
-    current_text = []
-    
-    for line in trans_lines:
-        match = re.match(r'^(\d+)\.\s*(.*)$', line)
-        if match:
-            if current_num is not None:
-                line_map[current_num] = '\n'.join(current_text)
-            current_num = int(match.group(1))
-            current_text = [match.group(2)]
-        elif current_num is not None and line.strip():
-            current_text.append(line.rstrip())
-    
-    if current_num is not None:
-        line_map[current_num] = '\n'.join(current_text)
-    
     translations = []
     for i in range(1, len(extractions) + 1):
         if i in line_map:
@@ -1269,14 +1349,19 @@ def reinsert_translations_txt(original_file: str, json_file: str, translated_fil
         if identifier_map:
             print(f" 🔍 Preserving {len(identifier_map)} identifiers...")
             identifier_preserved_count = 0
+            automaton = build_word_automaton(identifier_map)
             
             # For each translation, check if original had identifiers
             for i in range(len(translations)):
                 if i < len(extractions):
                     original_text = extractions[i].get('original', '')
                     
-                    # Find which identifiers were in the original
-                    found_ids = [ident for ident in identifier_map.keys() if ident in original_text]
+                    # Find which identifiers were in the original (one automaton pass
+                    # instead of a substring search per identifier)
+                    if automaton is not None:
+                        found_ids = find_words(automaton, original_text)
+                    else:
+                        found_ids = [ident for ident in identifier_map.keys() if ident in original_text]
                     
                     if found_ids and translations[i]:
                         # Replace English translations back to Chinese
@@ -1410,39 +1495,26 @@ def reinsert_war3map_j(j_path: str, tokens_dir: str, out_dir: str, write_utf8: b
         restrict_ui = False
         
         if os.path.exists(metadata_file):
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-                restrict_ui = metadata.get('restrict_ui', False)
+            metadata = load_json(metadata_file)
+            restrict_ui = metadata.get('restrict_ui', False)
             print(f" Loaded metadata from extraction")
             print(f" Original hash: {metadata.get('file_hash', 'N/A')[:16]}...")
             print(f" String count: {metadata.get('string_count', 'N/A')}")
         
-        # Load original extraction data
-        original_data = []
-        with open(map_file, 'r', encoding='utf-8') as f:
-            map_data = json.load(f)
+        # Load original extraction data as parallel lists (only these fields are used here)
+        original_texts = []
+        original_identifiers = []
+        original_encodings = []
+        map_data = load_json(map_file)
         
         for item in map_data:
+            original_encodings.append(item['encoding'])
             if 'index' in item:
-                original_data.append({
-                    'start': item['byte_start'],
-                    'end': item['byte_end'],
-                    'encoding': item['encoding'],
-                    'original_bytes': bytes.fromhex(item['raw_hex']),
-                    'original_text': item.get('original', ''),
-                    'context': item.get('context', 'unknown'),
-                    'contains_identifiers': item.get('contains_identifiers', [])
-                })
+                original_texts.append(item.get('original', ''))
+                original_identifiers.append(item.get('contains_identifiers', []))
             else:
-                original_data.append({
-                    'start': item['start'],
-                    'end': item['end'],
-                    'encoding': item['encoding'],
-                    'original_bytes': bytes.fromhex(item['raw_hex']),
-                    'original_text': '',
-                    'context': 'unknown',
-                    'contains_identifiers': []
-                })
+                original_texts.append('')
+                original_identifiers.append([])
         
         # Load identifier dictionary if preservation is enabled
         identifier_map = {}
@@ -1455,51 +1527,34 @@ def reinsert_war3map_j(j_path: str, tokens_dir: str, out_dir: str, write_utf8: b
                 print(f" ⚠️ No identifier dictionary found - skipping preservation")
         
         # Read translations
-        with open(tokens_file, 'r', encoding='utf-8-sig', newline=None) as f:
-            content = f.read()
-        
-        trans_lines = content.split('\n')
-        line_map = {}
-        current_num = None
-        current_text = []
-        
-        for line in trans_lines:
-            match = re.match(r'^(\d+)\.\s*(.*)', line)
-            if match:
-                if current_num is not None:
-                    line_map[current_num] = ' '.join(current_text)
-                current_num = int(match.group(1))
-                current_text = [match.group(2)]
-            elif current_num is not None and line.strip():
-                current_text.append(line.rstrip())
-        
-        if current_num is not None:
-            line_map[current_num] = '\n'.join(current_text)
+        line_map = load_line_map(tokens_file)
         
         print(f"\n 🔄 Processing translations...")
         
         translations = []
+        # Fixes auto-fix applied to each string, kept for the change report
+        applied_fixes = [None] * len(original_texts)
         auto_fix_count = 0
         identifier_preserved_count = 0
         
-        for i in range(1, len(original_data) + 1):
+        for i in range(1, len(original_texts) + 1):
             if i in line_map:
-                trans = line_map[i]
+                # Continuation lines are joined with newlines; a JASS string stays on one line
+                trans = line_map[i].replace('\n', ' ')
                 
                 # CRITICAL FIX: Preserve identifiers in Mode 2
-                if preserve_identifiers and identifier_map and i-1 < len(original_data):
-                    original_chinese = original_data[i-1]['original_text']
-                    contains_ids = original_data[i-1].get('contains_identifiers', [])
+                if preserve_identifiers and identifier_map:
+                    original_chinese = original_texts[i-1]
+                    contains_ids = original_identifiers[i-1]
                     
                     if original_chinese and contains_ids:
-                        # Replace identifiers back to Chinese to preserve them
+                        # Replace identifiers back to Chinese to preserve them, all in one pass
+                        restore = {}
                         for chinese_id in contains_ids:
                             if chinese_id in identifier_map:
-                                english_id = identifier_map[chinese_id]
-                                # Replace English back to Chinese
-                                if english_id in trans:
-                                    trans = trans.replace(english_id, chinese_id)
-                                    identifier_preserved_count += 1
+                                restore.setdefault(identifier_map[chinese_id], chinese_id)
+                        trans, restored = multi_replace(trans, restore)
+                        identifier_preserved_count += restored
                 
                 # Auto-fix if enabled
                 if auto_fix:
@@ -1507,9 +1562,11 @@ def reinsert_war3map_j(j_path: str, tokens_dir: str, out_dir: str, write_utf8: b
                     if fixes:
                         auto_fix_count += 1
                         trans = fixed_trans
+                        applied_fixes[i - 1] = fixes
                 
-                # Apply legacy encoding fixes
-                trans = sanitize_for_legacy_encoding(trans)
+                # Apply legacy encoding fixes (UTF-8 output can keep every character)
+                if not write_utf8:
+                    trans = sanitize_for_legacy_encoding(trans)
                 translations.append(trans)
             else:
                 print(f" ⚠️ WARNING: Missing translation for entry {i}")
@@ -1523,17 +1580,25 @@ def reinsert_war3map_j(j_path: str, tokens_dir: str, out_dir: str, write_utf8: b
         
         with open(j_path, 'rb') as f:
             data = f.read()
-        
-        current_hash = hashlib.sha256(data).hexdigest()
-        
-        if metadata and metadata.get('file_hash') != current_hash:
-            print(f" ⚠️ WARNING: File hash mismatch!")
-            print(f"   Expected: {metadata.get('file_hash', 'N/A')[:16]}...")
-            print(f"   Current: {current_hash[:16]}...")
-            response = input("   Continue anyway? (y/n): ").strip().lower()
-            if response != 'y':
-                print(" Reinsertion cancelled.")
-                return False
+            file_stat = os.fstat(f.fileno())
+        
+        # The hash only verifies the file against its extraction metadata; skip it without one
+        if metadata:
+            if (metadata.get('file_hash') and metadata.get('file_mtime_ns') == file_stat.st_mtime_ns
+                    and metadata.get('file_size') == file_stat.st_size):
+                # Same size and modification time as at extraction: reuse the recorded digest
+                current_hash = metadata['file_hash']
+            else:
+                current_hash = hashlib.sha256(data).hexdigest()
+            
+            if metadata.get('file_hash') != current_hash:
+                print(f" ⚠️ WARNING: File hash mismatch!")
+                print(f"   Expected: {metadata.get('file_hash', 'N/A')[:16]}...")
+                print(f"   Current: {current_hash[:16]}...")
+                response = input("   Continue anyway? (y/n): ").strip().lower()
+                if response != 'y':
+                    print(" Reinsertion cancelled.")
+                    return False
         
         tokens_now = scan_strings(data, restrict_ui=restrict_ui)
         
@@ -1544,127 +1609,159 @@ def reinsert_war3map_j(j_path: str, tokens_dir: str, out_dir: str, write_utf8: b
             print(f"   Difference: {len(translations) - len(tokens_now):+d}")
             return False
         
+        # Encoding each string is written back in, resolved once for validation and output.
+        # UTF-8 output needs none: it can represent every character.
+        target_encodings = []
+        if not write_utf8:
+            for idx in range(len(tokens_now)):
+                target_enc = original_encodings[idx] if idx < len(original_encodings) else None
+                if not target_enc or target_enc == 'None':
+                    target_enc = 'gbk'
+                target_encodings.append(target_enc)
+        
         changes = []
         encoding_warnings = 0
         empty_translations = []
+        # (text, encoding) -> (encoded bytes, lossy); maps repeat the same strings many times
+        encoded_cache = {}
+        # Tokens come in file order, so line numbers are kept as a running count: each change
+        # only counts the newlines since the previous one (one pass over the file in total)
+        line_num = 1
+        line_offset = 0
+        
+        print(f"\n 🔧 Building output file...")
         
-        for idx, (t, trans) in enumerate(zip(tokens_now, translations)):
-            if not trans or trans.strip() == '':
-                empty_translations.append(idx + 1)
-                translations[idx] = t.text
-                print(f" ⚠️ WARNING: Empty translation at string {idx+1}, using original text")
+        out_path = os.path.join(out_dir, base)
+        cursor = 0
+        # Stream the spliced file straight to disk; memoryview slices avoid temporary copies.
+        # Size and newline count are kept up to date as each string is swapped.
+        source = memoryview(data)
+        new_size = len(data)
+        new_newlines = data.count(b'\n')
+        last_byte = data[-1] if data else None
+        
+        with open(out_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            if write_utf8:
+                f.write(b'\xef\xbb\xbf')
             
-            # Track changes
-            if generate_report and trans != t.text:
-                line_num = byte_offset_to_line_number(data, t.start)
-                ctx_before, ctx_after = get_context_around_offset(data, t.start)
+            # One pass per string: fallback, change tracking, then a single encode that
+            # both validates the text and produces the bytes written out
+            for idx, (t, trans) in enumerate(zip(tokens_now, translations)):
+                text = trans
+                if not trans or trans.strip() == '':
+                    empty_translations.append(idx + 1)
+                    text = t.text
                 
-                # Check if this was auto-fixed
-                was_fixed = (idx + 1) <= len(line_map) and auto_fix
-                fixes = []
-                if was_fixed and (idx + 1) in line_map:
-                    _, fixes = fix_jass_string(line_map[idx + 1], idx + 1)
+                # Track changes against what is written: a string that fell back to its
+                # original is the same object, which the comparison settles at once
+                if generate_report and text != t.text:
+                    line_num += data.count(b'\n', line_offset, t.start)
+                    line_offset = t.start
+                    ctx_before, ctx_after = get_context_around_offset(data, t.start)
+                    
+                    # Check if this was auto-fixed
+                    fixes = applied_fixes[idx]
+                    
+                    changes.append(ChangeInfo(
+                        index=idx + 1,
+                        byte_start=t.start,
+                        byte_end=t.end,
+                        line_number=line_num,
+                        original=t.text,
+                        translation=text,
+                        context_before=ctx_before,
+                        context_after=ctx_after,
+                        auto_fixed=fixes is not None,
+                        fixes_applied=fixes
+                    ))
                 
-                changes.append(ChangeInfo(
-                    index=idx + 1,
-                    byte_start=t.start,
-                    byte_end=t.end,
-                    line_number=line_num,
-                    original=t.text,
-                    translation=trans,
-                    context_before=ctx_before,
-                    context_after=ctx_after,
-                    auto_fixed=len(fixes) > 0,
-                    fixes_applied=fixes if fixes else None
-                ))
-            
-            target_enc = original_data[idx]['encoding'] if idx < len(original_data) else 'gb18030'
-            
-            if not write_utf8:
-                compatible, problematic = validate_encoding_compatibility(translations[idx], target_enc)
-                if not compatible:
-                    encoding_warnings += 1
-                    if encoding_warnings <= 3:
-                        print(f" ⚠️ String {idx+1}: Characters incompatible with {target_enc}: {problematic}")
+                if write_utf8:
+                    # UTF-8 represents every character, so there is nothing to validate
+                    repl = text.encode('utf-8')
+                else:
+                    target_enc = target_encodings[idx]
+                    cache_key = (text, target_enc)
+                    encoded = encoded_cache.get(cache_key)
+                    if encoded is None:
+                        encoded = encode_for_output(text, target_enc)
+                        encoded_cache[cache_key] = encoded
+                    repl, lossy = encoded
+                    if lossy:
+                        encoding_warnings += 1
+                        if encoding_warnings <= 3:
+                            _, problematic = validate_encoding_compatibility(text, target_enc)
+                            print(f" ⚠️ String {idx+1}: Characters incompatible with {target_enc}, dropped: {problematic}")
+                
+                f.write(source[cursor:t.start])
+                f.write(repl)
+                new_size += len(repl) - (t.end - t.start)
+                new_newlines += repl.count(b'\n') - data.count(b'\n', t.start, t.end)
+                if t.end == len(data):
+                    # Nothing follows this string, so it decides how the file ends
+                    last_byte = repl[-1] if repl else (data[t.start - 1] if t.start else None)
+                cursor = t.end
+            
+            f.write(source[cursor:])
+        source.release()
         
         if encoding_warnings > 3:
             print(f" ⚠️ ... and {encoding_warnings - 3} more encoding warnings")
         
         if empty_translations:
+            # Reported after the pass in one write rather than a print per string
+            sys.stdout.write(''.join(
+                f" ⚠️ WARNING: Empty translation at string {n}, using original text\n" for n in empty_translations
+            ))
             print(f" ⚠️ Found {len(empty_translations)} empty translations, replaced with originals")
         
-        print(f"\n 🔧 Building output file...")
-        
-        out_bytes = bytearray()
-        cursor = 0
-        
-        for idx, t in enumerate(tokens_now):
-            out_bytes.extend(data[cursor:t.start])
-            
-            if write_utf8:
-                target_enc = 'utf-8'
-            elif idx < len(original_data):
-                target_enc = original_data[idx]['encoding']
-                if not target_enc or target_enc == 'None':
-                    target_enc = 'gbk'
-            else:
-                target_enc = 'gbk'
-            
-            try:
-                repl = translations[idx].encode(target_enc, errors='strict')
-            except UnicodeEncodeError:
-                print(f" ⚠️ String {idx+1}: Encoding to {target_enc} failed, using 'ignore' mode")
-                repl = translations[idx].encode(target_enc, errors='ignore')
-            
-            out_bytes.extend(repl)
-            cursor = t.end
-        
-        out_bytes.extend(data[cursor:])
-        
         # LINE COUNT ANALYSIS
-        line_comparison = compare_line_counts(data, out_bytes)
-        
-        print(f"\n{'='*70}")
-        print(" LINE COUNT ANALYSIS")
-        print(f"{'='*70}")
-        print(f" Original file: {line_comparison['original']} lines")
-        print(f" New file: {line_comparison['new']} lines")
-        print(f" Difference: {line_comparison['difference']:+d} lines")
+        original_lines = count_lines_in_bytes(data)
+        new_lines = new_newlines + (1 if new_size and last_byte != 0x0A else 0)
+        line_comparison = {
+            'original': original_lines,
+            'new': new_lines,
+            'difference': new_lines - original_lines
+        }
+        
+        # The summary is collected and written once instead of a print per line
+        summary = []
+        say = summary.append
+        say(f"\n{'='*70}")
+        say(" LINE COUNT ANALYSIS")
+        say(f"{'='*70}")
+        say(f" Original file: {line_comparison['original']} lines")
+        say(f" New file: {line_comparison['new']} lines")
+        say(f" Difference: {line_comparison['difference']:+d} lines")
         
         if line_comparison['difference'] != 0:
-            print(f"\n ⚠️ WARNING: Line count changed by {line_comparison['difference']:+d}!")
+            say(f"\n ⚠️ WARNING: Line count changed by {line_comparison['difference']:+d}!")
             if auto_fix:
-                print(f"   This shouldn't happen with auto-fix enabled.")
-                print(f"   There may be residual issues in the translations.")
+                say(f"   This shouldn't happen with auto-fix enabled.")
+                say(f"   There may be residual issues in the translations.")
         else:
-            print(f" ✓ Line count preserved - safe to proceed!")
-        
-        out_path = os.path.join(out_dir, base)
-        
-        with open(out_path, 'wb') as f:
-            if write_utf8:
-                f.write(b'\xef\xbb\xbf')
-            f.write(out_bytes)
+            say(f" ✓ Line count preserved - safe to proceed!")
         
-        size_diff = len(out_bytes) - len(data)
+        size_diff = new_size - len(data)
         size_pct = (size_diff / len(data)) * 100
         
-        print(f"\n ✅ Wrote translated file to {out_path}")
-        print(f" Original size: {len(data):,} bytes")
-        print(f" New size: {len(out_bytes):,} bytes")
-        print(f" Difference: {size_diff:+,} bytes ({size_pct:+.2f}%)")
+        say(f"\n ✅ Wrote translated file to {out_path}")
+        say(f" Original size: {len(data):,} bytes")
+        say(f" New size: {new_size:,} bytes")
+        say(f" Difference: {size_diff:+,} bytes ({size_pct:+.2f}%)")
         
         if auto_fix_count > 0:
-            print(f" Auto-fixed strings: {auto_fix_count}")
+            say(f" Auto-fixed strings: {auto_fix_count}")
         
         if identifier_preserved_count > 0:
-            print(f" Identifiers preserved: {identifier_preserved_count}")
+            say(f" Identifiers preserved: {identifier_preserved_count}")
         
         if encoding_warnings > 0:
-            print(f" Encoding warnings: {encoding_warnings}")
+            say(f" Encoding warnings: {encoding_warnings}")
         
         if empty_translations:
-            print(f" Empty translations replaced: {len(empty_translations)}")
+            say(f" Empty translations replaced: {len(empty_translations)}")
+        
+        sys.stdout.write('\n'.join(summary) + '\n')
         
         # Generate reports
         if generate_report and len(changes) > 0:
@@ -1764,6 +1861,9 @@ def synchronized_translation_mode(jfile: str, txtfiles: List[str], tokens_dir: s
     print("="*70)
     
     txt_updated = 0
+    # A field shorter than the shortest identifier cannot contain one, which lets the
+    # many short name fields skip the identifier lookups entirely
+    min_ident_len = min((len(ident) for ident in identifier_map), default=0)
     
     for txt_file in txtfiles:
         if not os.path.exists(txt_file):
@@ -1780,51 +1880,33 @@ def synchronized_translation_mode(jfile: str, txtfiles: List[str], tokens_dir: s
             continue
         
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                extractions = json.load(f)
-            
-            with open(txt_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            extractions = load_json(json_file)
             
             # Load manual translations if they exist
             line_map = {}
             if os.path.exists(translated_txt):
-                with open(translated_txt, 'r', encoding='utf-8', newline=None) as f:
-                    trans_content = f.read()
-                
-                trans_lines = trans_content.split('\n')
-                current_num = None
-                current_text = []
-                
-                for line in trans_lines:
-                    match = re.match(r'^(\d+)\.\s*(.*)', line)
-                    if match:
-                        if current_num is not None:
-                            line_map[current_num] = '\n'.join(current_text)
-                        current_num = int(match.group(1))
-                        current_text = [match.group(2)]
-                    elif current_num is not None and line.strip():
-                        current_text.append(line.rstrip())
-                
-                if current_num is not None:
-                    line_map[current_num] = '\n'.join(current_text)
+                line_map = load_line_map(translated_txt)
             else:
                 print(f" ℹ No manual translations found, using identifier-only mode...")
             
-            lines = content.split('\n')
+            # Replacement lines by line index; the file is then copied through line by line
+            # instead of being read whole, split and joined back together
+            new_lines = {}
             identifier_priority_count = 0
             normal_translation_count = 0
             
             for idx, extract in enumerate(extractions):
                 original_chinese = extract.get('original', '')
+                may_have_idents = len(original_chinese) >= min_ident_len
                 
                 # HYBRID APPROACH: Apply identifier replacements to manual translation
-                if idx + 1 in line_map:
+                translation = line_map.get(idx + 1)
+                if translation is not None:
                     # Have manual translation
-                    translation = line_map[idx + 1]
-                    
-                    # Check if original contains identifiers
-                    found_idents = [ident for ident in identifier_map.keys() if ident in original_chinese]
+                    # Check if original contains identifiers (one pass over the cached index that
+                    # apply_identifiers_to_translation uses too, not a search per identifier)
+                    found_idents = may_have_idents and se.StringExtractor.check_string_for_identifiers(
+                        original_chinese, identifier_map)
                     
                     if found_idents:
                         # Apply identifier translations TO the manual translation
@@ -1837,32 +1919,39 @@ def synchronized_translation_mode(jfile: str, txtfiles: List[str], tokens_dir: s
                     else:
                         # No identifiers, use manual translation as-is
                         normal_translation_count += 1
-                else:
+                elif may_have_idents:
                     # No manual translation, just replace identifiers in original
                     translation, _ = se.StringExtractor.replace_identifiers_in_text(original_chinese, identifier_map)
+                else:
+                    translation = original_chinese
 
                 
                 # Apply the translation
-                line_idx = extract['line'] - 1
-                if line_idx < len(lines):
-                    key = extract['key']
-                    is_custom_box = extract.get('custom_box', False)
-                    
-                    if extract['format'] == 'unquoted':
-                        if is_custom_box and translation and not translation.startswith('"'):
-                            new_line = f'{key}="{translation}"'
-                        else:
-                            new_line = f'{key}={translation}'
-                    else:
+                key = extract['key']
+                is_custom_box = extract.get('custom_box', False)
+                
+                if extract['format'] == 'unquoted':
+                    if is_custom_box and translation and not translation.startswith('"'):
                         new_line = f'{key}="{translation}"'
-                    
-                    lines[line_idx] = new_line
+                    else:
+                        new_line = f'{key}={translation}'
+                else:
+                    new_line = f'{key}="{translation}"'
+                
+                new_lines[extract['line'] - 1] = new_line
             
-            content = '\n'.join(lines)
             output_file = os.path.join(out_dir, base_name)
             
-            with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
-                f.write(content)
+            with open(txt_file, 'r', encoding='utf-8') as src, \
+                    open(output_file, 'w', encoding='utf-8', newline='\n', buffering=WRITE_BUFFER_SIZE) as f:
+                for line_idx, line in enumerate(src):
+                    new_line = new_lines.get(line_idx)
+                    if new_line is None:
+                        f.write(line)
+                    elif line.endswith('\n'):
+                        f.write(new_line + '\n')
+                    else:
+                        f.write(new_line)
             
             print(f" ✓ Saved to: {output_file}")
             print(f"   {identifier_priority_count} fields with hybrid translation")
@@ -1937,7 +2026,7 @@ def auto_translate_mode(tokens_dir: str):
         indices = []
         
         for line in lines:
-            match = re.match(r'^(\d+)\.\s*(.*)', line)
+            match = NUMBERED_LINE_PATTERN.match(line)
             if match:
                 idx = int(match.group(1))
                 text = match.group(2).strip()